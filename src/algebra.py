@@ -1,7 +1,76 @@
-from ecdsa.numbertheory import square_root_mod_prime
+from ecdsa.numbertheory import SquareRootError
+import os
+import warnings
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+# Integer arithmetic behind GF and FElt, chosen when a field is constructed
+# Python integers are always available, gmpy2's mpz is much faster at 254 bits when it is installed (the gmpy2 extra)
+class IntBackend:
+    name = 'int'
+
+    def integer(value):
+        return int(value)
+
+    def powmod(base, exponent, modulus):
+        return pow(base, exponent, modulus)
+
+    # Inverse by Fermat's little theorem, zero maps to zero
+    def inverse(value, modulus):
+        return pow(value, modulus - 2, modulus)
+
+class Gmpy2Backend:
+    name = 'gmpy2'
+
+    def integer(value):
+        return gmpy2.mpz(value)
+
+    def powmod(base, exponent, modulus):
+        return gmpy2.powmod(base, exponent, modulus)
+
+    # gmpy2.invert raises for zero, which is mapped to zero like with Python integers
+    def inverse(value, modulus):
+        if value == 0:
+            return value
+        return gmpy2.invert(value, modulus)
+
+backends = {
+    'int': IntBackend,
+    'gmpy2': Gmpy2Backend,
+}
+
+# Integer types that may appear as field element values, for isinstance checks
+integer_types = (int,) if gmpy2 is None else (int, type(gmpy2.mpz(0)))
+
+# Backend of fields constructed without one, fields built at import time such as the curve's base field use it
+# It can also be set with the BABY_JUBJUB_BACKEND environment variable
+default_backend = os.environ.get("BABY_JUBJUB_BACKEND", "int")
+
+def set_default_backend(name):
+    global default_backend
+    if name not in backends:
+        raise ValueError(f"Unknown backend {name}.")
+    default_backend = name
+
+# Looks a backend up by name, falling back to Python integers when gmpy2 is asked for but not installed
+def get_backend(name=None):
+    if name is None:
+        name = default_backend
+    if name not in backends:
+        raise ValueError(f"Unknown backend {name}.")
+    if name == 'gmpy2' and gmpy2 is None:
+        warnings.warn("gmpy2 is not installed, falling back to Python integers.")
+        return IntBackend
+    return backends[name]
 
 # Some basic finite field algebra
 class FElt:
+    # Elements are created in hot loops, so they carry no per-instance __dict__
+    __slots__ = ('field', 'value')
+
     def __init__(self, field, value):
         if not isinstance(field, GF):
             raise ValueError('Field must be an instance of GaloisField')
@@ -11,45 +80,138 @@ class FElt:
         self.value = value % field.order
     
     def __add__(self, other):
-        if self.field.order != other.field.order:
+        field = self.field
+        if field is not other.field and field.order != other.field.order:
             raise TypeError('Cannot add elements from different fields')
-        return self.field((self.value + other.value) % self.field.order)
+        return field._new((self.value + other.value) % field.order)
     
     def __sub__(self, other):
-        if self.field.order != other.field.order:
+        field = self.field
+        if field is not other.field and field.order != other.field.order:
             raise TypeError('Cannot subtract elements from different fields')
-        return self.field((self.value - other.value) % self.field.order)
+        return field._new((self.value - other.value) % field.order)
     
     def __mul__(self, other):
-        if self.field.order != other.field.order:
+        field = self.field
+        if field is not other.field and field.order != other.field.order:
             raise TypeError('Cannot multiply elements from different fields')
-        return self.field((self.value * other.value) % self.field.order)
+        return field._new(self.value * other.value % field.order)
     
     def __truediv__(self, other):
-        if self.field.order != other.field.order:
+        field = self.field
+        if field is not other.field and field.order != other.field.order:
             raise TypeError('Cannot divide elements from different fields')
-        return self * self.field(pow(other.value, self.field.order - 2, self.field.order))
+        return field._new(self.value * field.backend.inverse(other.value, field.order) % field.order)
 
     def __neg__(self):
         if self.value == 0:
             return self
-        return self.field(self.field.order - self.value)
+        return self.field._new(self.field.order - self.value)
     
     def __eq__(self, other):
-        if self.field.order != other.field.order:
+        if self.field is not other.field and self.field.order != other.field.order:
             raise TypeError('Cannot compare elements from different fields')
         return self.value == other.value
     
     def __str__(self):
         return str(self.value)
     
-    # I'm cheating here
+    # Euler's criterion, one exponentiation and no square root, zero counts as a square
+    def is_square(self):
+        field = self.field
+        return self.value == 0 or field.backend.powmod(self.value, (field.order - 1) // 2, field.order) == 1
+
+    # Tonelli-Shanks square root, raising SquareRootError for quadratic non-residues
+    # The 2-adic part of the order and its roots of unity are precomputed once per field, so the only
+    # exponentiation is a^((Q - 1) / 2) and the rest is a few squarings and table lookups
     def sqrt(self):
-        return self.field(square_root_mod_prime(self.value, self.field.order))
+        field = self.field
+        order = field.order
+        if self.value == 0:
+            return self
+        s, q, roots = field._sqrt_params()
+
+        w = field.backend.powmod(self.value, (q - 1) // 2, order)
+        # x = a^((Q + 1) / 2) and b = a^Q, x^2 = a * b is kept invariant while b is driven to 1
+        x = self.value * w % order
+        b = x * w % order
+        m = s
+        j = 0
+        while b != 1:
+            # Find the least i with b^(2^i) = 1
+            i = 0
+            b2 = b
+            while b2 != 1:
+                b2 = b2 * b2 % order
+                i += 1
+                if i == m:
+                    raise SquareRootError(f"{self.value} is not a square modulo {order}")
+            # roots[j] has order 2^m, multiplying by roots[j + m - i - 1] lowers the order of b
+            x = x * roots[j + m - i - 1] % order
+            b = b * roots[j + m - i] % order
+            j += m - i
+            m = i
+        return field._new(x)
 
 class GF:
-    def __init__(self, order):
-        self.order = order
+    def __init__(self, order, backend=None):
+        self.backend = get_backend(backend)
+        self.order = self.backend.integer(order)
+        # Interned constants, so that hot code paths do not build new elements for them
+        self.zero = self._new(self.backend.integer(0))
+        self.one = self._new(self.backend.integer(1))
+        self.two = self._new(self.backend.integer(2))
+        self.three = self._new(self.backend.integer(3))
+        self._sqrt_cache = None
     
     def __call__(self, value):
-        return FElt(self, value)
\ No newline at end of file
+        return FElt(self, value)
+
+    # Writes order - 1 = Q * 2^S with Q odd, and precomputes c^(2^i) for a primitive 2^S-th root of unity c
+    # Only valid for odd prime orders
+    def _sqrt_params(self):
+        if self._sqrt_cache is None:
+            q = self.order - 1
+            s = 0
+            while q % 2 == 0:
+                q //= 2
+                s += 1
+            z = self.backend.integer(2)
+            while self.backend.powmod(z, (self.order - 1) // 2, self.order) != self.order - 1:
+                z += 1
+            roots = [self.backend.powmod(z, q, self.order)]
+            for _ in range(s):
+                roots.append(roots[-1] * roots[-1] % self.order)
+            self._sqrt_cache = (s, q, roots)
+        return self._sqrt_cache
+
+    # Builds an element from a value that is already reduced modulo the order, skipping the checks in FElt.__init__
+    # Only for values produced by field operations
+    def _new(self, value):
+        elt = FElt.__new__(FElt)
+        elt.field = self
+        elt.value = value
+        return elt
+
+    # Inverts every element with a single exponentiation using Montgomery's simultaneous inversion trick
+    # n inversions cost one exponentiation and 3(n - 1) multiplications
+    # Zero has no inverse, and like division by zero it maps to zero
+    def batch_inverse(self, elements):
+        values = [element.value for element in elements]
+        prefix = []
+        acc = self.backend.integer(1)
+        for value in values:
+            if value != 0:
+                acc = acc * value % self.order
+            prefix.append(acc)
+
+        inv = self.backend.inverse(acc, self.order)
+        inverses = [None] * len(values)
+        for i in reversed(range(len(values))):
+            if values[i] == 0:
+                inverses[i] = self.zero
+                continue
+            before = prefix[i - 1] if i > 0 else 1
+            inverses[i] = self._new(inv * before % self.order)
+            inv = inv * values[i] % self.order
+        return inverses
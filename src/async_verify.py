@@ -0,0 +1,136 @@
+# Asyncio front-end for ECDSA verification over Baby Jubjub
+# Concurrent verify_async calls are coalesced into micro-batches, bounded by a maximum batch size and a maximum wait,
+# and every batch is verified in an executor so the event loop is never blocked by curve arithmetic
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from parallel import _init_worker, _representations, _check_verify_input, _verify_items
+
+# Wire format: (digest, pubKey x, pubKey y, r, s), returning an outcome per item as in parallel._verify_items
+def _verify_batch(representation_name, batch):
+    return _verify_items(_representations[representation_name], batch)
+
+class AsyncVerifier:
+    # Without an executor, the verifier creates a process pool of max_workers processes, by default one per CPU,
+    # and shuts it down when closed. A caller passing its own executor must also give max_in_flight, the number of
+    # batches handed to it at once, as the verifier cannot tell how many workers the executor has
+    def __init__(self, representation, executor=None, max_batch_size=64, max_wait=0.005, max_pending=4096, max_in_flight=None, max_workers=None):
+        assert(representation in [SWPoint, MontPoint, TwEdPoint])
+        if max_batch_size < 1:
+            raise ValueError("Maximum batch size must be positive.")
+        if max_wait < 0:
+            raise ValueError("Maximum wait cannot be negative.")
+        self.representation = representation
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.owns_executor = executor is None
+        if executor is None:
+            if max_workers is None:
+                max_workers = os.cpu_count() or 1
+            if max_workers < 1:
+                raise ValueError("Maximum number of workers must be positive.")
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(representation.__name__, None),
+            )
+            # By default one batch in flight per worker
+            if max_in_flight is None:
+                max_in_flight = max_workers
+        else:
+            if max_workers is not None:
+                raise ValueError("Maximum number of workers only applies to an executor created by the verifier.")
+            if max_in_flight is None:
+                raise ValueError("Maximum batches in flight must be given with an executor.")
+        if max_in_flight < 1:
+            raise ValueError("Maximum batches in flight must be positive.")
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.queue = None
+        self.collector = None
+        self.in_flight = None
+        self.batches = set()
+
+    async def start(self):
+        if self.collector is not None:
+            return
+        # Requests wait in a bounded queue, so callers are slowed down when verification falls behind
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        self.collector = asyncio.get_running_loop().create_task(self._collect())
+
+    # Stops accepting requests once everything already queued has been verified
+    async def close(self):
+        if self.collector is not None:
+            await self.queue.join()
+            self.collector.cancel()
+            try:
+                await self.collector
+            except asyncio.CancelledError:
+                pass
+            self.collector = None
+        if self.batches:
+            await asyncio.gather(*self.batches, return_exceptions=True)
+        if self.owns_executor:
+            self.executor.shutdown()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def verify_async(self, digest, pubKey, r, s):
+        # Bad input fails here, rather than in the batch it would share with other requests
+        _check_verify_input(self.representation, digest, pubKey, r, s)
+        if self.collector is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put(((digest, pubKey.x.value, pubKey.y.value, r, s), future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.in_flight.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self.batches.add(task)
+            task.add_done_callback(self.batches.discard)
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            outcomes = await loop.run_in_executor(
+                self.executor, _verify_batch, self.representation.__name__, [item for item, _ in batch]
+            )
+            # Every future only receives the outcome of its own request
+            for (_, future), (ok, value) in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        # Only failures of the executor itself, which affect the whole batch, end up here
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.in_flight.release()
+            for _ in batch:
+                self.queue.task_done()
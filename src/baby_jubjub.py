@@ -1,5 +1,63 @@
-from algebra import GF
+from algebra import GF, integer_types
 from ecdsa.numbertheory import SquareRootError
+import os
+
+# When enabled, points produced by curve operations are checked to be on the curve like any other point
+# Meant for testing, it can also be turned on by setting the BABY_JUBJUB_DEBUG environment variable
+debug_checks = os.environ.get("BABY_JUBJUB_DEBUG", "") not in ("", "0")
+
+def set_debug_checks(enabled):
+    global debug_checks
+    debug_checks = enabled
+
+# Swaps a and b when swap is 1, using masking rather than a branch on swap
+def _cswap(swap, a, b):
+    dummy = -swap & (a.value ^ b.value)
+    return a.field._new(a.value ^ dummy), b.field._new(b.value ^ dummy)
+
+# Width-w non-adjacent form of a non-negative scalar, least significant digit first
+# Every nonzero digit is odd and less than 2^(w-1) in absolute value, and is followed by at least w - 1 zeros
+def wnaf(scalar, width):
+    digits = []
+    while scalar > 0:
+        if scalar & 1:
+            digit = scalar & ((1 << width) - 1)
+            if digit >= 1 << (width - 1):
+                digit -= 1 << width
+            scalar -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        scalar >>= 1
+    return digits
+
+# Points whose x-coordinate is x_int + m * n for the prime subgroup order n, as (m, point) pairs
+# ECDSA reduces R.x modulo n, so these are the candidates for R given r. Offsets with x_int + m * n >= p are
+# dropped before any field arithmetic. A non-residue is detected by sqrt itself, after the same single
+# exponentiation a separate quadratic residue test would cost
+# offsets restricts the search to the given values of m, by default every m below the cofactor is tried
+def recover_candidates(representation, x_int, offsets=None):
+    if not isinstance(x_int, integer_types):
+        raise TypeError("x must be an integer.")
+    if x_int < 0 or x_int >= representation.p:
+        raise ValueError("x must be in the field.")
+
+    if offsets is None:
+        offsets = range(representation.cofactor)
+
+    candidates = []
+    for m in offsets:
+        x_full = x_int + m * representation.prime_subgroup_order
+        if x_full >= representation.p:
+            break
+        x = representation.Fr(x_full)
+        y2 = representation.y_squared(x)
+        try:
+            y = y2.sqrt()
+        except SquareRootError:
+            continue
+        candidates += [(m, representation.from_affine(x, y)), (m, representation.from_affine(x, -y))]
+    return candidates
 
 class BabyJubjubPoint:
     # Base field
@@ -8,6 +66,8 @@ class BabyJubjubPoint:
     order = 21888242871839275222246405745257275088614511777268538073601725287587578984328
     cofactor = 8
     prime_subgroup_order = order // cofactor
+    # Window width used by wnaf_mul
+    wnaf_width = 5
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
@@ -18,21 +78,67 @@ class BabyJubjubPoint:
             return False
         return self.x == other.x and self.y == other.y
 
+    # Points built by the trusted constructors skip the curve check unless debug checks are enabled
+    def _check_trusted(self):
+        if debug_checks and not self.is_on_curve():
+            raise ValueError(f"Curve operation produced a point that is not on the curve: {self}")
+        return self
+
+    def double(self):
+        return self + self
+
+    # Converts back to affine coordinates, a no-op for representations that are always affine
+    def _normalize(self):
+        pass
+
     def scalar_mul(self, scalar):
-        if not isinstance(scalar, int):
+        return self.wnaf_mul(scalar)
+
+    # Whether the point is in the prime order subgroup, i.e. has no small order component
+    # Costs one scalar multiplication
+    def is_in_prime_subgroup(self):
+        return self.scalar_mul(self.prime_subgroup_order).is_infinity()
+
+    # Iterative scalar multiplication using the width-w non-adjacent form of the scalar
+    # The odd multiples P, 3P, ..., (2^(w-1) - 1)P are precomputed, and each nonzero digit costs one addition
+    def wnaf_mul(self, scalar, width=None):
+        if not isinstance(scalar, integer_types):
             raise TypeError("Scalar must be an integer.")
         if scalar < 0:
             raise ValueError("Scalar must be non-negative.")
+        if width is None:
+            width = self.wnaf_width
+        if width < 4 or width > 6:
+            raise ValueError("Window width must be between 4 and 6.")
         if scalar == 0:
             return self.__class__.infinity()
-        if scalar == 1:
-            return self
-        if scalar % 2 == 0:
-            return (self + self).scalar_mul(scalar // 2)
-        else:
-            return self + self.scalar_mul(scalar - 1)
+
+        digits = wnaf(scalar, width)
+        table = self._odd_multiples(width)
+        result = None
+        for digit in reversed(digits):
+            if result is not None:
+                result = result.double()
+            if digit != 0:
+                term = table[abs(digit) // 2] if digit > 0 else -table[abs(digit) // 2]
+                result = term if result is None else result + term
+
+        # Normalize once, after all the additions have been done in projective coordinates
+        result._normalize()
+        return result
+
+    # Returns [P, 3P, 5P, ..., (2^(w-1) - 1)P]
+    def _odd_multiples(self, width):
+        double = self.double()
+        table = [self]
+        for _ in range(1, 1 << (width - 2)):
+            table.append(table[-1] + double)
+        return table
         
 # A Baby Jubjub point represented in Short Weierstrass form
+# Points are stored in Jacobian coordinates (X:Y:Z) with x = X/Z^2 and y = Y/Z^3, so that addition and
+# doubling need no field inversions. The point at infinity is any point with Z = 0.
+# The affine coordinates are only computed when read.
 class SWPoint(BabyJubjubPoint):
     Fr = BabyJubjubPoint.Fr
     # Short Weierstrass parameters
@@ -44,23 +150,94 @@ class SWPoint(BabyJubjubPoint):
     By = Fr(14577268218881899420966779687690205425227431577728659819975198491127179315626)
 
     def __init__(self, x, y):
+        self._affine = True
         # Point at infinity
         if x is None and y is None:  
-            self.x = self.y = None
+            self._x = self._y = None
+            self.X = self.Y = self.Fr.one
+            self.Z = self.Fr.zero
             return
 
-        if isinstance(x, int):
-            self.x = self.Fr(x)
-        else:
-            self.x = x
-        if isinstance(y, int):
-            self.y = self.Fr(y)
-        else:
-            self.y = y
+        if isinstance(x, integer_types):
+            x = self.Fr(x)
+        if isinstance(y, integer_types):
+            y = self.Fr(y)
+        self._x = self.X = x
+        self._y = self.Y = y
+        self.Z = self.Fr.one
 
         if not self.is_on_curve():
             raise ValueError(f"The point ({x}, {y}) is not on the curve.")
+
+    # Builds a point from affine coordinates without checking it is on the curve
+    # Only used for points produced by curve operations, which are on the curve by construction
+    def from_affine(x, y):
+        pt = SWPoint.__new__(SWPoint)
+        pt._affine = True
+        pt._x = pt.X = x
+        pt._y = pt.Y = y
+        pt.Z = SWPoint.Fr.one
+        return pt._check_trusted()
+
+    # Builds a point directly from Jacobian coordinates, also without checking it is on the curve
+    def from_jacobian(X, Y, Z):
+        pt = SWPoint.__new__(SWPoint)
+        pt._affine = False
+        pt._x = pt._y = None
+        pt.X = X
+        pt.Y = Y
+        pt.Z = Z
+        return pt._check_trusted()
+
+    @property
+    def x(self):
+        self._normalize()
+        return self._x
+
+    @property
+    def y(self):
+        self._normalize()
+        return self._y
+
+    # Converts back to affine coordinates, costing a single inversion
+    def _normalize(self):
+        if self._affine:
+            return
+        self._set_z_inverse(self.Fr.one / self.Z)
+
+    # Converts many points back to affine coordinates, costing a single inversion for all of them
+    def normalize_batch(points):
+        pending = [pt for pt in points if not pt._affine]
+        for pt, z_inv in zip(pending, SWPoint.Fr.batch_inverse([pt.Z for pt in pending])):
+            pt._set_z_inverse(z_inv)
+        return points
+
+    def _set_z_inverse(self, z_inv):
+        self._affine = True
+        if self.Z == self.Fr.zero:
+            self._x = self._y = None
+            self.X = self.Y = self.Fr.one
+            return
+        z_inv2 = z_inv * z_inv
+        self._x = self.X * z_inv2
+        self._y = self.Y * z_inv2 * z_inv
+        self.X = self._x
+        self.Y = self._y
+        self.Z = self.Fr.one
+
+    def __eq__(self, other):
+        if not isinstance(other, SWPoint):
+            raise TypeError("Can only compare points in the same representation.")
+        if self.is_infinity() and other.is_infinity():
+            return True
+        if self.is_infinity() or other.is_infinity():
+            return False
+        z1z1 = self.Z * self.Z
+        z2z2 = other.Z * other.Z
+        return self.X * z2z2 == other.X * z1z1 and self.Y * z2z2 * other.Z == other.Y * z1z1 * self.Z
     
+    # Formula: https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#addition-add-2007-bl
+    # When one of the points has Z = 1 the cheaper mixed addition madd-2007-bl is used instead
     def __add__(self, other):
         if not isinstance(other, SWPoint):
             raise TypeError("Can only add Short Weierstrass points to other Short Weierstrass points.")
@@ -70,25 +247,83 @@ class SWPoint(BabyJubjubPoint):
         
         if other.is_infinity():
             return self
-        
-        # Adding a point and its inverse gives infinity
-        if self.x == other.x and self.y == -other.y:
-            return SWPoint(None, None)
-        
-        x1 = self.x
-        y1 = self.y
-        x2 = other.x
-        y2 = other.y
-        
-        if x1 == x2 and y1 == y2:
-            lam = (self.Fr(3) * x1 * x1 + self.a) / (self.Fr(2) * y1)
-        else:
-            lam = (y2 - y1) / (x2 - x1)
-        
-        x3 = lam * lam - x1 - x2
-        y3 = lam * (x1 - x3) - y1
 
-        return SWPoint(x3, y3)
+        if other.Z == self.Fr.one:
+            return self._add_affine(other)
+        if self.Z == self.Fr.one:
+            return other._add_affine(self)
+
+        z1z1 = self.Z * self.Z
+        z2z2 = other.Z * other.Z
+        u1 = self.X * z2z2
+        u2 = other.X * z1z1
+        s1 = self.Y * other.Z * z2z2
+        s2 = other.Y * self.Z * z1z1
+        h = u2 - u1
+        r = self.Fr.two * (s2 - s1)
+        if h == self.Fr.zero:
+            # Adding a point and its inverse gives infinity
+            if r != self.Fr.zero:
+                return SWPoint.infinity()
+            return self.double()
+
+        i = (h + h) * (h + h)
+        j = h * i
+        v = u1 * i
+        x3 = r * r - j - self.Fr.two * v
+        y3 = r * (v - x3) - self.Fr.two * s1 * j
+        z3 = ((self.Z + other.Z) * (self.Z + other.Z) - z1z1 - z2z2) * h
+
+        return SWPoint.from_jacobian(x3, y3, z3)
+
+    # Adds a point with Z = 1
+    def _add_affine(self, other):
+        z1z1 = self.Z * self.Z
+        u2 = other.X * z1z1
+        s2 = other.Y * self.Z * z1z1
+        h = u2 - self.X
+        r = self.Fr.two * (s2 - self.Y)
+        if h == self.Fr.zero:
+            # Adding a point and its inverse gives infinity
+            if r != self.Fr.zero:
+                return SWPoint.infinity()
+            return self.double()
+
+        hh = h * h
+        i = (hh + hh) + (hh + hh)
+        j = h * i
+        v = self.X * i
+        x3 = r * r - j - self.Fr.two * v
+        y3 = r * (v - x3) - self.Fr.two * self.Y * j
+        z3 = (self.Z + h) * (self.Z + h) - z1z1 - hh
+
+        return SWPoint.from_jacobian(x3, y3, z3)
+
+    # Doubling for a generic curve parameter a, a point with y = 0 doubles to infinity (Z3 = 0)
+    # Formula: https://hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#doubling-dbl-2007-bl
+    def double(self):
+        if self.is_infinity():
+            return self
+
+        xx = self.X * self.X
+        yy = self.Y * self.Y
+        yyyy = yy * yy
+        zz = self.Z * self.Z
+        s = self.Fr.two * ((self.X + yy) * (self.X + yy) - xx - yyyy)
+        m = self.Fr.three * xx + self.a * zz * zz
+        t = m * m - self.Fr.two * s
+        yyyy4 = (yyyy + yyyy) + (yyyy + yyyy)
+        y3 = m * (s - t) - (yyyy4 + yyyy4)
+        z3 = (self.Y + self.Z) * (self.Y + self.Z) - yy - zz
+
+        return SWPoint.from_jacobian(t, y3, z3)
+    
+    def __neg__(self):
+        if self.is_infinity():
+            return self
+        if self._affine:
+            return SWPoint.from_affine(self.x, -self.y)
+        return SWPoint.from_jacobian(self.X, -self.Y, self.Z)
     
     def __str__(self):
         if self.is_infinity():
@@ -96,7 +331,7 @@ class SWPoint(BabyJubjubPoint):
         return f"SW: ({self.x}, {self.y})"
     
     def is_infinity(self):
-        return self.x is None and self.y is None
+        return self.Z == self.Fr.zero
     
     def infinity():
         return SWPoint(None, None)
@@ -107,24 +342,43 @@ class SWPoint(BabyJubjubPoint):
     def base():
         return SWPoint(SWPoint.Bx, SWPoint.By)
     
-    def recover_from_x(x_int):
-        if not isinstance(x_int, int):
-            raise TypeError("x must be an integer.")
-        if x_int < 0 or x_int >= SWPoint.p:
+    # 32-byte compressed encoding: x in little-endian with the parity of y in the top bit
+    # The point at infinity is encoded with only bit 254 set, which no x below p can have on its own
+    def compress(self):
+        if self.is_infinity():
+            return (1 << 254).to_bytes(32, 'little')
+        return (self.x.value | ((self.y.value & 1) << 255)).to_bytes(32, 'little')
+
+    # Decompression needs a single square root
+    def decompress(data):
+        if len(data) != 32:
+            raise ValueError("Compressed point must be 32 bytes.")
+        encoded = int.from_bytes(data, 'little')
+        if encoded == 1 << 254:
+            return SWPoint.infinity()
+        odd = encoded >> 255
+        x_int = encoded & ((1 << 255) - 1)
+        if x_int >= SWPoint.p:
             raise ValueError("x must be in the field.")
-        
-        possible_points = []
-        # r is modded by the order of the subgroup, so we must try all possible values of r
-        for m in range(SWPoint.cofactor):
-            x = SWPoint.Fr(x_int) + SWPoint.Fr(m) * SWPoint.Fr(SWPoint.prime_subgroup_order)
-            y2 = x * x * x + SWPoint.a * x + SWPoint.b
-            try:
-                y = y2.sqrt()
-                possible_points += [SWPoint(x, y), SWPoint(x, -y)]
-            except SquareRootError:
-                pass
-        
-        return possible_points
+
+        x = SWPoint.Fr(x_int)
+        try:
+            y = (x * x * x + SWPoint.a * x + SWPoint.b).sqrt()
+        except SquareRootError:
+            raise ValueError("The compressed point is not on the curve.")
+        if y.value & 1 != odd:
+            y = -y
+        if y.value & 1 != odd:
+            raise ValueError("The compressed point is not on the curve.")
+        return SWPoint.from_affine(x, y)
+
+    # Solves the curve equation for y^2
+    def y_squared(x):
+        return x * x * x + SWPoint.a * x + SWPoint.b
+
+    # All points whose x-coordinate reduces to x_int modulo the prime subgroup order
+    def recover_from_x(x_int):
+        return [pt for _, pt in recover_candidates(SWPoint, x_int)]
 
     def is_on_curve(self):
         if self.is_infinity():
@@ -141,7 +395,7 @@ class SWPoint(BabyJubjubPoint):
         
         nx = self.x - MontPoint.alpha
         ny = self.y
-        return MontPoint(nx, ny)
+        return MontPoint.from_affine(nx, ny)
     
 # A Baby Jubjub point represented in Montgomery form
 class MontPoint(BabyJubjubPoint):
@@ -150,6 +404,8 @@ class MontPoint(BabyJubjubPoint):
     A = Fr(168698)
     B = Fr(1)
     alpha = A / Fr(3)
+    # Constant used by the Montgomery ladder doubling
+    a24 = (A + Fr(2)) / Fr(4)
     Gx = Fr(7)
     Gy = Fr(4258727773875940690362607550498304598101071202821725296872974770776423442226)
     Bx = Fr(7117928050407583618111176421555214756675765419608405867398403713213306743542)
@@ -161,11 +417,11 @@ class MontPoint(BabyJubjubPoint):
             self.x = self.y = None
             return
 
-        if isinstance(x, int):
+        if isinstance(x, integer_types):
             self.x = self.Fr(x)
         else:
             self.x = x
-        if isinstance(y, int):
+        if isinstance(y, integer_types):
             self.y = self.Fr(y)
         else:
             self.y = y
@@ -173,6 +429,14 @@ class MontPoint(BabyJubjubPoint):
         if not self.is_on_curve():
             raise ValueError(f"The point ({x}, {y}) is not on the curve.")
     
+    # Builds a point from affine coordinates without checking it is on the curve
+    # Only used for points produced by curve operations, which are on the curve by construction
+    def from_affine(x, y):
+        pt = MontPoint.__new__(MontPoint)
+        pt.x = x
+        pt.y = y
+        return pt._check_trusted()
+
     def __add__(self, other):
         if not isinstance(other, MontPoint):
             raise TypeError("Can only add Montgomery points to other Montgomery points.")
@@ -193,14 +457,94 @@ class MontPoint(BabyJubjubPoint):
         y2 = other.y
         
         if x1 == x2 and y1 == y2:
-            lam = (self.Fr(3) * x1 * x1 + self.Fr(2) * self.A * x1 + self.Fr(1)) / (self.Fr(2) * self.B * y1)
+            lam = (self.Fr.three * x1 * x1 + self.Fr.two * self.A * x1 + self.Fr.one) / (self.Fr.two * self.B * y1)
         else:
             lam = (y2 - y1) / (x2 - x1)
         
         x3 = self.B * lam * lam - self.A - x1 - x2
-        y3 = (self.Fr(2) * x1 + x2 + self.A) * lam - self.B * lam * lam * lam - y1
+        y3 = (self.Fr.two * x1 + x2 + self.A) * lam - self.B * lam * lam * lam - y1
+
+        return MontPoint.from_affine(x3, y3)
+    
+    def __neg__(self):
+        if self.is_infinity():
+            return self
+        return MontPoint.from_affine(self.x, -self.y)
+
+    # Montgomery points are always affine
+    def normalize_batch(points):
+        return points
 
-        return MontPoint(x3, y3)
+    # Montgomery ladder over x-only (X:Z) coordinates, followed by Okeya-Sakurai y-recovery
+    # Every bit costs one differential addition and one doubling and the number of steps only depends
+    # on the bit length of the group order, so the running time does not depend on the bits of the scalar
+    # Reference: Montgomery curves and their arithmetic, https://eprint.iacr.org/2017/212
+    def scalar_mul(self, scalar):
+        if not isinstance(scalar, integer_types):
+            raise TypeError("Scalar must be an integer.")
+        if scalar < 0:
+            raise ValueError("Scalar must be non-negative.")
+        if self.is_infinity():
+            return self
+        # Points of order 2 have y = 0, which the y-recovery divides by
+        if self.y == self.Fr.zero:
+            return self if scalar % 2 == 1 else MontPoint.infinity()
+
+        # (x2:z2) starts at infinity and (x3:z3) at this point, their difference is always this point
+        x1 = self.x
+        x2, z2 = self.Fr.one, self.Fr.zero
+        x3, z3 = x1, self.Fr.one
+        swap = 0
+        for i in reversed(range(max(scalar.bit_length(), self.order.bit_length()))):
+            bit = (scalar >> i) & 1
+            swap ^= bit
+            x2, x3 = _cswap(swap, x2, x3)
+            z2, z3 = _cswap(swap, z2, z3)
+            swap = bit
+
+            a = x2 + z2
+            aa = a * a
+            b = x2 - z2
+            bb = b * b
+            e = aa - bb
+            c = x3 + z3
+            d = x3 - z3
+            da = d * a
+            cb = c * b
+            x3 = (da + cb) * (da + cb)
+            z3 = x1 * (da - cb) * (da - cb)
+            x2 = aa * bb
+            z2 = e * (bb + self.a24 * e)
+        x2, x3 = _cswap(swap, x2, x3)
+        z2, z3 = _cswap(swap, z2, z3)
+
+        return self._recover_y(x2, z2, x3, z3)
+
+    # Recovers k * P from this point P, x(k * P) = (x2:z2) and x((k + 1) * P) = (x3:z3)
+    # Reference: Algorithm 5 in https://eprint.iacr.org/2017/212
+    def _recover_y(self, x2, z2, x3, z3):
+        if z2 == self.Fr.zero:
+            return MontPoint.infinity()
+        # (k + 1) * P is infinity, so k * P = -P
+        if z3 == self.Fr.zero:
+            return MontPoint.from_affine(self.x, -self.y)
+
+        v1 = self.x * z2
+        v2 = x2 + v1
+        v3 = (x2 - v1) * (x2 - v1) * x3
+        v1 = self.Fr.two * self.A * z2
+        v2 = v2 + v1
+        v4 = self.x * x2 + z2
+        v2 = v2 * v4
+        v1 = v1 * z2
+        v2 = (v2 - v1) * z3
+        y = v2 - v3
+        v1 = self.Fr.two * self.B * self.y * z2 * z3
+        x = v1 * x2
+        z = v1 * z2
+
+        z_inv = self.Fr.one / z
+        return MontPoint.from_affine(x * z_inv, y * z_inv)
     
     def __str__(self):
         if self.is_infinity():
@@ -228,42 +572,34 @@ class MontPoint(BabyJubjubPoint):
 
         return lhs == rhs
         
+    # Solves the curve equation for y^2
+    def y_squared(x):
+        return (x * x * x + MontPoint.A * x * x + x) / MontPoint.B
+
+    # All points whose x-coordinate reduces to x_int modulo the prime subgroup order
     def recover_from_x(x_int):
-        if not isinstance(x_int, int):
-            raise TypeError("x must be an integer.")
-        if x_int < 0 or x_int >= MontPoint.p:
-            raise ValueError("x must be in the field.")
-        
-        possible_points = []
-        # r is modded by the order of the subgroup, so we must try all possible values of r
-        for m in range(MontPoint.cofactor):
-            x = MontPoint.Fr(x_int) + MontPoint.Fr(m) * MontPoint.Fr(MontPoint.prime_subgroup_order)
-            y2 = (x * x * x + MontPoint.A * x * x + x) / MontPoint.B
-            try:
-                y = y2.sqrt()
-                possible_points += [MontPoint(x, y), MontPoint(x, -y)]
-            except SquareRootError:
-                pass
-            
-        return possible_points
+        return [pt for _, pt in recover_candidates(MontPoint, x_int)]
     
     def to_short_weierstrass(self):
         if self.is_infinity():
             return SWPoint.infinity()
         
-        nx = (self.x + self.A / self.Fr(3)) / self.B
+        nx = (self.x + self.A / self.Fr.three) / self.B
         ny = self.y / self.B
-        return SWPoint(nx, ny)
+        return SWPoint.from_affine(nx, ny)
     
     def to_twisted_edwards(self):
         if self.is_infinity():
             return TwEdPoint.infinity()
         
         nx = self.x / self.y
-        ny = (self.x - self.Fr(1)) / (self.x + self.Fr(1))
-        return TwEdPoint(nx, ny)
+        ny = (self.x - self.Fr.one) / (self.x + self.Fr.one)
+        return TwEdPoint.from_affine(nx, ny)
     
 # A Baby Jubjub point represented in Twisted Edwards form
+# Points are stored in extended coordinates (X:Y:Z:T) with x = X/Z, y = Y/Z and x * y = T/Z, so that
+# addition and doubling need no field inversions. The affine coordinates are only computed when read.
+# Reference: Twisted Edwards Curves Revisited, https://eprint.iacr.org/2008/522
 class TwEdPoint(BabyJubjubPoint):
     Fr = BabyJubjubPoint.Fr
     # Twisted Edwards parameters
@@ -276,40 +612,119 @@ class TwEdPoint(BabyJubjubPoint):
 
     def __init__(self, x, y):
         # No special point at infinity in Twisted Edwards form
-        if isinstance(x, int):
-            self.x = self.Fr(x)
-        else:
-            self.x = x
-        if isinstance(y, int):
-            self.y = self.Fr(y)
-        else:
-            self.y = y
+        if isinstance(x, integer_types):
+            x = self.Fr(x)
+        if isinstance(y, integer_types):
+            y = self.Fr(y)
+        self._x = x
+        self._y = y
+        self.X = x
+        self.Y = y
+        self.Z = self.Fr.one
+        self.T = x * y
 
         if not self.is_on_curve():
             raise ValueError(f"The point ({x}, {y}) is not on the curve.")
+
+    # Builds a point from affine coordinates without checking it is on the curve
+    # Only used for points produced by curve operations, which are on the curve by construction
+    def from_affine(x, y):
+        pt = TwEdPoint.__new__(TwEdPoint)
+        pt._x = pt.X = x
+        pt._y = pt.Y = y
+        pt.Z = TwEdPoint.Fr.one
+        pt.T = x * y
+        return pt._check_trusted()
+
+    # Builds a point directly from extended coordinates, also without checking it is on the curve
+    def from_extended(X, Y, Z, T):
+        pt = TwEdPoint.__new__(TwEdPoint)
+        pt._x = pt._y = None
+        pt.X = X
+        pt.Y = Y
+        pt.Z = Z
+        pt.T = T
+        return pt._check_trusted()
+
+    @property
+    def x(self):
+        self._normalize()
+        return self._x
+
+    @property
+    def y(self):
+        self._normalize()
+        return self._y
+
+    # Converts back to affine coordinates, costing a single inversion
+    def _normalize(self):
+        if self._x is not None:
+            return
+        self._set_z_inverse(self.Fr.one / self.Z)
+
+    # Converts many points back to affine coordinates, costing a single inversion for all of them
+    def normalize_batch(points):
+        pending = [pt for pt in points if pt._x is None]
+        for pt, z_inv in zip(pending, TwEdPoint.Fr.batch_inverse([pt.Z for pt in pending])):
+            pt._set_z_inverse(z_inv)
+        return points
+
+    def _set_z_inverse(self, z_inv):
+        self._x = self.X * z_inv
+        self._y = self.Y * z_inv
+        self.X = self._x
+        self.Y = self._y
+        self.Z = self.Fr.one
+        self.T = self._x * self._y
+
+    def __eq__(self, other):
+        if not isinstance(other, TwEdPoint):
+            raise TypeError("Can only compare points in the same representation.")
+        return self.X * other.Z == other.X * self.Z and self.Y * other.Z == other.Y * self.Z
     
+    # Unified addition, this is complete on Baby Jubjub since A is a square and d is not
+    # Formula: https://hyperelliptic.org/EFD/g1p/auto-twisted-extended.html#addition-add-2008-hwcd
     def __add__(self, other):
         if not isinstance(other, TwEdPoint):
             raise TypeError("Can only add Twisted Edwards points to other Twisted Edwards points.")
         
-        x1 = self.x
-        y1 = self.y
-        x2 = other.x
-        y2 = other.y
-        
-        x3 = (x1 * y2 + y1 * x2) / (self.Fr(1) + self.d * x1 * x2 * y1 * y2)
-        y3 = (y1 * y2 - self.A * x1 * x2) / (self.Fr(1) - self.d * x1 * x2 * y1 * y2)
+        a = self.X * other.X
+        b = self.Y * other.Y
+        c = self.d * self.T * other.T
+        d = self.Z * other.Z
+        e = (self.X + self.Y) * (other.X + other.Y) - a - b
+        f = d - c
+        g = d + c
+        h = b - self.A * a
+
+        return TwEdPoint.from_extended(e * f, g * h, f * g, e * h)
 
-        return TwEdPoint(x3, y3)
+    # Formula: https://hyperelliptic.org/EFD/g1p/auto-twisted-extended.html#doubling-dbl-2008-hwcd
+    def double(self):
+        a = self.X * self.X
+        b = self.Y * self.Y
+        c = self.Fr.two * self.Z * self.Z
+        d = self.A * a
+        e = (self.X + self.Y) * (self.X + self.Y) - a - b
+        g = d + b
+        f = g - c
+        h = d - b
+
+        return TwEdPoint.from_extended(e * f, g * h, f * g, e * h)
+    
+    def __neg__(self):
+        if self._x is not None:
+            return TwEdPoint.from_affine(-self.x, self.y)
+        return TwEdPoint.from_extended(-self.X, self.Y, self.Z, -self.T)
     
     def __str__(self):
         return f"TwEd: ({self.x}, {self.y})"
     
     def is_infinity(self):
-        return self.x == self.Fr(0) and self.y == self.Fr(1)
+        return self.X == self.Fr.zero and self.Y == self.Z
     
     def infinity():
-        return TwEdPoint(BabyJubjubPoint.Fr(0), BabyJubjubPoint.Fr(1))
+        return TwEdPoint(BabyJubjubPoint.Fr.zero, BabyJubjubPoint.Fr.one)
     
     def generator():
         return TwEdPoint(TwEdPoint.Gx, TwEdPoint.Gy)
@@ -319,33 +734,73 @@ class TwEdPoint(BabyJubjubPoint):
 
     def is_on_curve(self):
         lhs = self.A * self.x * self.x + self.y * self.y
-        rhs = self.Fr(1) + self.d * self.x * self.x * self.y * self.y
+        rhs = self.Fr.one + self.d * self.x * self.x * self.y * self.y
 
         return lhs == rhs
     
+    # 32-byte compressed encoding from EIP-2494: y in little-endian, with the top bit set when x > (p - 1) / 2
+    def compress(self):
+        sign = 1 if self.x.value > (self.p - 1) // 2 else 0
+        return (self.y.value | (sign << 255)).to_bytes(32, 'little')
+
+    # Decompression needs a single square root, x^2 = (1 - y^2) / (A - d * y^2)
+    # The denominator is never zero, since A / d is not a square
+    def decompress(data):
+        if len(data) != 32:
+            raise ValueError("Compressed point must be 32 bytes.")
+        encoded = int.from_bytes(data, 'little')
+        sign = encoded >> 255
+        y_int = encoded & ((1 << 255) - 1)
+        if y_int >= TwEdPoint.p:
+            raise ValueError("y must be in the field.")
+
+        y = TwEdPoint.Fr(y_int)
+        yy = y * y
+        try:
+            x = ((TwEdPoint.Fr.one - yy) / (TwEdPoint.A - TwEdPoint.d * yy)).sqrt()
+        except SquareRootError:
+            raise ValueError("The compressed point is not on the curve.")
+        if (x.value > (TwEdPoint.p - 1) // 2) != sign:
+            x = -x
+        if x.value == 0 and sign:
+            raise ValueError("The compressed point is not canonical.")
+        return TwEdPoint.from_affine(x, y)
+
+    # Solves the curve equation for y^2
+    def y_squared(x):
+        return (TwEdPoint.A * x * x - TwEdPoint.Fr.one) / (TwEdPoint.d * x * x - TwEdPoint.Fr.one)
+
+    # All points whose x-coordinate reduces to x_int modulo the prime subgroup order
     def recover_from_x(x_int):
-        if not isinstance(x_int, int):
-            raise TypeError("x must be an integer.")
-        if x_int < 0 or x_int >= TwEdPoint.p:
-            raise ValueError("x must be in the field.")
-        
-        possible_points = []
-        # r is modded by the order of the subgroup, so we must try all possible values of r
-        for m in range(MontPoint.cofactor):
-            x = TwEdPoint.Fr(x_int) + TwEdPoint.Fr(m) * TwEdPoint.Fr(TwEdPoint.prime_subgroup_order)
-            y2 = (TwEdPoint.A * x * x - TwEdPoint.Fr(1)) / (TwEdPoint.d * x * x - TwEdPoint.Fr(1))
-            try:
-                y = y2.sqrt()
-                possible_points += [TwEdPoint(x, y), TwEdPoint(x, -y)]
-            except SquareRootError:
-                pass
-            
-        return possible_points
+        return [pt for _, pt in recover_candidates(TwEdPoint, x_int)]
     
     def to_montgomery(self):
         if self.is_infinity():
             return MontPoint.infinity()
         
-        nx = (self.Fr(1) + self.y) / (self.Fr(1) - self.y)
-        ny = (self.Fr(1) + self.y) / ((self.Fr(1) - self.y) * self.x)
-        return MontPoint(nx, ny)
\ No newline at end of file
+        nx = (self.Fr.one + self.y) / (self.Fr.one - self.y)
+        ny = (self.Fr.one + self.y) / ((self.Fr.one - self.y) * self.x)
+        return MontPoint.from_affine(nx, ny)
+
+    # Converts many points to Montgomery form, costing a single inversion for all of them
+    # With y = Y/Z and x = X/Z the map is x' = (Z + Y) / (Z - Y) and y' = (Z + Y) * Z / ((Z - Y) * X),
+    # so the points need not be normalized first
+    def to_montgomery_batch(points):
+        finite = [not pt.is_infinity() for pt in points]
+        denominators = []
+        for pt, is_finite in zip(points, finite):
+            if is_finite:
+                d = pt.Z - pt.Y
+                denominators += [d, d * pt.X]
+        inverses = iter(TwEdPoint.Fr.batch_inverse(denominators))
+
+        converted = []
+        for pt, is_finite in zip(points, finite):
+            if not is_finite:
+                converted.append(MontPoint.infinity())
+                continue
+            numerator = pt.Z + pt.Y
+            nx = numerator * next(inverses)
+            ny = numerator * pt.Z * next(inverses)
+            converted.append(MontPoint.from_affine(nx, ny))
+        return converted
\ No newline at end of file
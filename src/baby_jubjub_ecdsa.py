@@ -1,7 +1,11 @@
 # Implementation of ECDSA over Baby Jubjub
-from algebra import GF
-from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+from algebra import GF, integer_types
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint, recover_candidates
+from fixed_base import base_mul, base_table, PreparedPublicKey
+from constant_time import base_mul as constant_time_base_mul
+from msm import multi_scalar_mul
 from ecdsa.numbertheory import SquareRootError
+import secrets
 
 # Note we use the prime order subgroup generated by the base point of Baby Jubjub
 cofactor = 8
@@ -9,25 +13,81 @@ order = BabyJubjubPoint.order // cofactor
 Fr = BabyJubjubPoint.Fr
 Fn = GF(order)
 
-def keygen(representation, seed):
+# Public keys can be passed as PreparedPublicKey, whose table is then used to multiply them
+def _check_public_key(representation, pubKey):
+    if isinstance(pubKey, PreparedPublicKey):
+        assert(pubKey.representation == representation)
+    else:
+        assert(isinstance(pubKey, representation))
+
+def _public_point(pubKey):
+    if isinstance(pubKey, PreparedPublicKey):
+        return pubKey.point
+    return pubKey
+
+# Private keys and nonces are secret, and with constant_time=True their multiples of the base point are computed
+# with constant_time.base_mul, whose sequence of operations does not depend on the scalar
+def _secret_base_mul(representation, scalar, constant_time):
+    if constant_time:
+        return constant_time_base_mul(representation, scalar)
+    return base_mul(representation, scalar)
+
+def keygen(representation, seed, constant_time=False):
     assert(representation in [SWPoint, MontPoint, TwEdPoint])
-    assert(isinstance(seed, int))
+    assert(isinstance(seed, integer_types))
 
     # Generate a private key
     if seed <= 0 or seed >= order:
         raise ValueError("Seed must be in the range [1, order - 1]")
-    priv = Fn(seed).value
+    priv = int(Fn(seed).value)
     
     # Generate the public key
-    pub = representation.base().scalar_mul(priv)
+    pub = _secret_base_mul(representation, priv, constant_time)
     
     return (priv, pub)
 
-def sign(representation, digest, privKey, random_k):
+# Generates a key pair for every seed, returning (privKey, pubKey) pairs in the order of the seeds
+# Seeds in arithmetic progression are walked with P_(i + 1) = P_i + step * G, costing one addition per key,
+# and any other seeds are multiplied from the fixed-base table. Either way the public keys are left projective
+# and normalized together with a single inversion. Montgomery keys are computed in Twisted Edwards form,
+# where additions need no inversions, and converted with a single inversion as well.
+def keygen_batch(representation, seeds):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    seeds = list(seeds)
+    for seed in seeds:
+        assert(isinstance(seed, integer_types))
+        if seed <= 0 or seed >= order:
+            raise ValueError("Seed must be in the range [1, order - 1]")
+    if len(seeds) == 0:
+        return []
+
+    curve = TwEdPoint if representation == MontPoint else representation
+    step = seeds[1] - seeds[0] if len(seeds) > 1 else 0
+    if step != 0 and all(seeds[i + 1] - seeds[i] == step for i in range(len(seeds) - 1)):
+        step_point = base_mul(curve, step % order)
+        pubs = [base_mul(curve, seeds[0])]
+        for _ in range(len(seeds) - 1):
+            pubs.append(pubs[-1] + step_point)
+    else:
+        table = base_table(curve)
+        pubs = [table.scalar_mul(seed, normalize=False) for seed in seeds]
+
+    if representation == MontPoint:
+        pubs = TwEdPoint.to_montgomery_batch(pubs)
+    else:
+        representation.normalize_batch(pubs)
+    return [(int(seed), pub) for seed, pub in zip(seeds, pubs)]
+
+def sign(representation, digest, privKey, random_k, constant_time=False):
+    r, s, _ = _sign(representation, digest, privKey, random_k, constant_time)
+    return (r, s)
+
+# Returns (r, s, R), so that sign_recoverable can derive the recovery id from R without computing it again
+def _sign(representation, digest, privKey, random_k, constant_time):
     assert(representation in [SWPoint, MontPoint, TwEdPoint])
-    assert(isinstance(digest, int))
-    assert(isinstance(privKey, int))
-    assert(isinstance(random_k, int))
+    assert(isinstance(digest, integer_types))
+    assert(isinstance(privKey, integer_types))
+    assert(isinstance(random_k, integer_types))
     assert(privKey > 0 and privKey < order)
     assert(random_k > 0 and random_k < order)
 
@@ -35,7 +95,7 @@ def sign(representation, digest, privKey, random_k):
     k = random_k
     
     # Generate the random point
-    R = representation.base().scalar_mul(k)
+    R = _secret_base_mul(representation, k, constant_time)
     r = Fn(R.x.value)
     if r == Fn(0):
         raise ValueError("Failed to generate a valid signature. Try again with a different nonce.")
@@ -45,15 +105,31 @@ def sign(representation, digest, privKey, random_k):
     if s == Fn(0):
         raise ValueError("Failed to generate a valid signature. Try again with a different nonce.")
     
-    return (r.value, s.value)
+    # Plain integers whatever the field backend, so that signatures serialize the same way
+    return (int(r.value), int(s.value), R)
+
+# Signs with a (k, r, k^-1 mod n) triple taken from a NoncePool, so no curve arithmetic is left to do
+# Every triple is used for at most one signature, including the rare triple that gives s = 0 and is discarded
+def sign_with_pool(representation, digest, privKey, pool):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    assert(pool.representation == representation)
+    assert(isinstance(digest, integer_types))
+    assert(isinstance(privKey, integer_types))
+    assert(privKey > 0 and privKey < order)
+
+    while True:
+        _, r, k_inv = pool.take()
+        s = (Fn(digest) + Fn(r) * Fn(privKey)) * Fn(k_inv)
+        if s != Fn(0):
+            return (r, int(s.value))
 
 # Standard ECDSA verification algorithm
 def verify(representation, digest, pubKey, r, s):
     assert(representation in [SWPoint, MontPoint, TwEdPoint])
-    assert(isinstance(digest, int))
-    assert(isinstance(pubKey, representation))
-    assert(isinstance(r, int))
-    assert(isinstance(s, int))
+    assert(isinstance(digest, integer_types))
+    _check_public_key(representation, pubKey)
+    assert(isinstance(r, integer_types))
+    assert(isinstance(s, integer_types))
 
     if r <= 0 or r >= order or s <= 0 or s >= order:
         return False
@@ -61,7 +137,11 @@ def verify(representation, digest, pubKey, r, s):
     u_1 = Fn(digest) / Fn(s)
     u_2 = Fn(r) / Fn(s)
 
-    pt = representation.base().scalar_mul(u_1.value) + pubKey.scalar_mul(u_2.value)
+    # The base point multiple comes from its precomputed table, which is cheaper than sharing doublings with it
+    if isinstance(pubKey, PreparedPublicKey):
+        pt = base_mul(representation, u_1.value) + pubKey.scalar_mul(u_2.value)
+    else:
+        pt = base_mul(representation, u_1.value) + multi_scalar_mul([pubKey], [u_2.value])
     if pt.is_infinity():
         return False
     
@@ -74,37 +154,112 @@ def verify(representation, digest, pubKey, r, s):
 # The verification equation is taken from Efficient ECDSA: https://personaelabs.org/posts/efficient-ecdsa-1/
 def verify_with_advice(representation, digest, pubKey, r, s, R):
     assert(representation in [SWPoint, MontPoint, TwEdPoint])
-    assert(isinstance(digest, int))
-    assert(isinstance(pubKey, representation))
-    assert(isinstance(r, int))
-    assert(isinstance(s, int))
+    assert(isinstance(digest, integer_types))
+    _check_public_key(representation, pubKey)
+    assert(isinstance(r, integer_types))
+    assert(isinstance(s, integer_types))
     assert(isinstance(R, representation))
 
     if r <= 0 or r >= order or s <= 0 or s >= order:
         return False
 
-    sR = R.scalar_mul(s)
-    mG = representation.base().scalar_mul(digest)
-    rQa = pubKey.scalar_mul(r)
-    return sR == mG + rQa
+    # A prepared key is multiplied from its table, leaving only sR to need doublings
+    if isinstance(pubKey, PreparedPublicKey):
+        return multi_scalar_mul([R], [s]) == base_mul(representation, digest) + pubKey.scalar_mul(r)
 
-def recover_public_key(representation, digest, r, s):
+    # sR == mG + rQa is checked as sR - rQa == mG, so that sR and rQa share one chain of doublings
+    # and mG comes from the base point table
+    return multi_scalar_mul([R, -pubKey], [s, r]) == base_mul(representation, digest)
+
+# Signs like sign, additionally returning a recovery id v = 2 * m + (R.y mod 2), where R.x = r + m * order
+# Like Ethereum's v, the recovery id lets recover_public_key rebuild R directly instead of trying every candidate
+def sign_recoverable(representation, digest, privKey, random_k, constant_time=False):
+    r, s, R = _sign(representation, digest, privKey, random_k, constant_time)
+    v = int(2 * ((R.x.value - r) // order) + R.y.value % 2)
+    return (r, s, v)
+
+def recover_public_key(representation, digest, r, s, recovery_id=None):
     assert(representation in [SWPoint, MontPoint, TwEdPoint])
-    assert(isinstance(digest, int))
-    assert(isinstance(r, int))
-    assert(isinstance(s, int))
+    assert(isinstance(digest, integer_types))
+    assert(isinstance(r, integer_types))
+    assert(isinstance(s, integer_types))
 
     if r <= 0 or r >= order or s <= 0 or s >= order:
         return False
-    
-    possible_points = representation.recover_from_x(r)
-    possible_pub_keys = []
-    for pt in possible_points:
-        u_1 = Fn(0) - Fn(digest) / Fn(r)
-        u_2 = Fn(s) / Fn(r)
 
-        pub_key = representation.base().scalar_mul(u_1.value) + pt.scalar_mul(u_2.value)
+    # Q = r^-1 * (s * R - digest * G) for every candidate R
+    u_1 = Fn(0) - Fn(digest) / Fn(r)
+    u_2 = Fn(s) / Fn(r)
+    base = base_mul(representation, u_1.value)
+
+    if recovery_id is not None:
+        assert(isinstance(recovery_id, integer_types))
+        # R.x = r + m * order with m below the cofactor, so any other id cannot belong to a signature
+        if recovery_id < 0 or recovery_id >= 2 * cofactor:
+            return []
+        m, parity = divmod(recovery_id, 2)
+        for _, pt in recover_candidates(representation, r, [m]):
+            if pt.y.value % 2 == parity:
+                pub_key = base + multi_scalar_mul([pt], [u_2.value])
+                return [] if pub_key.is_infinity() else [pub_key]
+        return []
+
+    possible_pub_keys = []
+    for _, pt in recover_candidates(representation, r):
+        pub_key = base + multi_scalar_mul([pt], [u_2.value])
         if (verify(representation, digest, pub_key, r, s)):
             possible_pub_keys.append(pub_key)
 
-    return possible_pub_keys
\ No newline at end of file
+    return possible_pub_keys
+
+# Batch verification of signatures with R as advice, each item is (digest, pubKey, r, s, R) as in verify_with_advice
+# Each equation sR == mG + rQa is weighted by a random 128-bit z and the weighted equations are summed, so the whole
+# batch is checked with a single multi-scalar multiplication. When the check fails the batch is bisected to find the
+# invalid signatures. The sum is multiplied by the cofactor before it is compared with the identity, so a small order
+# component of R or a public key, which would vanish from the sum whenever z is a multiple of its order, is cleared
+# from every equation instead. With that, a batch containing an invalid signature passes with probability at most
+# about 2^-128. The check is cofactored: a signature is accepted when 8(sR - mG - rQa) is the identity, which for R and
+# public keys in the prime order subgroup, such as R = kG and keys from keygen, is the same as verify_with_advice.
+# Returns the sorted indices of the invalid signatures, so an empty list means every signature is valid
+def verify_batch(representation, items):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    invalid = []
+    candidates = []
+    for i, (digest, pubKey, r, s, R) in enumerate(items):
+        assert(isinstance(digest, integer_types))
+        _check_public_key(representation, pubKey)
+        assert(isinstance(r, integer_types))
+        assert(isinstance(s, integer_types))
+        assert(isinstance(R, representation))
+        if r <= 0 or r >= order or s <= 0 or s >= order:
+            invalid.append(i)
+        else:
+            candidates.append(i)
+
+    return sorted(invalid + _find_invalid(representation, items, candidates))
+
+def _find_invalid(representation, items, indices):
+    if len(indices) == 0 or _verify_combined(representation, items, indices):
+        return []
+    if len(indices) == 1:
+        return indices
+    mid = len(indices) // 2
+    return _find_invalid(representation, items, indices[:mid]) + _find_invalid(representation, items, indices[mid:])
+
+def _verify_combined(representation, items, indices):
+    points = []
+    scalars = []
+    base_scalar = 0
+    for i in indices:
+        digest, pubKey, r, s, R = items[i]
+        # A single equation needs no weight
+        z = secrets.randbits(128) if len(indices) > 1 else 1
+        points += [R, -_public_point(pubKey)]
+        scalars += [z * s % order, z * r % order]
+        base_scalar += z * digest
+    # The curve order is cofactor * order, so once the sum is multiplied by the cofactor the scalars only matter
+    # modulo order. The cofactor is 2^3, so multiplying by it takes three doublings
+    total = multi_scalar_mul(points, scalars) + -base_mul(representation, base_scalar)
+    for _ in range(cofactor.bit_length() - 1):
+        total = total.double()
+    return total.is_infinity()
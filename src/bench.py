@@ -0,0 +1,162 @@
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, sign, sign_recoverable, verify, verify_with_advice, recover_public_key
+from ecdsa import ellipticcurve
+from ecdsa.ellipticcurve import PointEdwards
+from ecdsa.ecdsa import Public_key, Private_key
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+
+# Benchmarks of the field, curve and ECDSA hot paths, with python-ecdsa's Point and PointEdwards on the same curve
+# for comparison. Results can be written as JSON and compared against a stored baseline:
+#   python bench.py --output baseline.json
+#   python bench.py --compare baseline.json
+# A benchmark regresses when it is slower than its baseline by more than the threshold, and then the exit status is 1
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_REPEAT = 5
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Baby Jubjub arithmetic and ECDSA.")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="compare the results against this JSON baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown counted as a regression, 0.2 by default")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timing runs per benchmark, the best is kept")
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this string")
+    args = parser.parse_args()
+
+    print("Benchmarking Baby Jubjub...")
+    results = {}
+    for name, f in _benchmarks():
+        if args.filter not in name:
+            continue
+        results[name] = _time(f, args.repeat)
+        print(f"{name:40} {_format(results[name])}")
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {name: {'seconds': seconds} for name, seconds in results.items()},
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+# Prints the change of every benchmark present in both reports, returning the names of those that regressed
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    print(f"\nComparing against baseline (threshold {threshold * 100:.0f}%)...")
+    regressions = []
+    for name, result in report['results'].items():
+        if name not in baseline['results']:
+            print(f"{name:40} not in baseline")
+            continue
+        before = baseline['results'][name]['seconds']
+        change = result['seconds'] / before - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:40} {_format(before)} -> {_format(result['seconds'])} ({change * 100:+.1f}%){flag}")
+    print(f"{len(regressions)} regression(s)")
+    return regressions
+
+# Best time per call over several runs, each run making enough calls to take at least 0.2 seconds
+def _time(f, repeat):
+    timer = timeit.Timer(f)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def _format(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:10.2f} us"
+    return f"{seconds * 1e3:10.2f} ms"
+
+# Every benchmark as a (name, function of no arguments) pair, all inputs are fixed so that runs are comparable
+def _benchmarks():
+    rng = random.Random(0)
+    order = BabyJubjubPoint.prime_subgroup_order
+    Fr = BabyJubjubPoint.Fr
+    a = Fr(rng.randrange(1, BabyJubjubPoint.p))
+    b = Fr(rng.randrange(1, BabyJubjubPoint.p))
+    square = a * a
+    scalar = rng.randrange(1, order)
+    benchmarks = [
+        ('felt_mul', lambda: a * b),
+        ('felt_inv', lambda: Fr.one / a),
+        ('felt_sqrt', lambda: square.sqrt()),
+    ]
+
+    seed = rng.randrange(1, order)
+    digest = rng.randrange(1, order)
+    random_k = rng.randrange(1, order)
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        name = representation.__name__
+        P = representation.base().scalar_mul(rng.randrange(1, order))
+        Q = representation.base().scalar_mul(rng.randrange(1, order))
+        priv, pub = keygen(representation, seed)
+        r, s, v = sign_recoverable(representation, digest, priv, random_k)
+        R = representation.base().scalar_mul(random_k)
+        benchmarks += [
+            (f'{name}.add', lambda P=P, Q=Q: P + Q),
+            (f'{name}.scalar_mul', lambda P=P: P.scalar_mul(scalar)),
+            (f'{name}.keygen', lambda representation=representation: keygen(representation, seed)),
+            (f'{name}.keygen_constant_time', lambda representation=representation: keygen(representation, seed, constant_time=True)),
+            (f'{name}.sign', lambda representation=representation: sign(representation, digest, priv, random_k)),
+            (f'{name}.verify', lambda representation=representation, pub=pub, r=r, s=s: verify(representation, digest, pub, r, s)),
+            (f'{name}.verify_with_advice',
+             lambda representation=representation, pub=pub, r=r, s=s, R=R: verify_with_advice(representation, digest, pub, r, s, R)),
+            (f'{name}.recover_public_key',
+             lambda representation=representation, r=r, s=s: recover_public_key(representation, digest, r, s)),
+            (f'{name}.recover_public_key_with_id',
+             lambda representation=representation, r=r, s=s, v=v: recover_public_key(representation, digest, r, s, v)),
+        ]
+
+    return benchmarks + _python_ecdsa_benchmarks(rng)
+
+# The same operations with python-ecdsa, built on the same curve as in verify_python_ecdsa.py
+def _python_ecdsa_benchmarks(rng):
+    p = BabyJubjubPoint.p
+    order = BabyJubjubPoint.prime_subgroup_order
+    SWellipticCurve = ellipticcurve.CurveFp(p, SWPoint.a.value, SWPoint.b.value)
+    TwEdellipticCurve = ellipticcurve.CurveEdTw(p, TwEdPoint.A.value, TwEdPoint.d.value)
+
+    def getTwEdPointFromxy(x, y):
+        return PointEdwards(TwEdellipticCurve, x, y, 1, x * y, order, False)
+
+    SWB = ellipticcurve.Point(SWellipticCurve, SWPoint.base().x.value, SWPoint.base().y.value, order=order)
+    TwEdB = getTwEdPointFromxy(TwEdPoint.base().x.value, TwEdPoint.base().y.value)
+    P = SWB * rng.randrange(1, order)
+    Q = SWB * rng.randrange(1, order)
+    EP = TwEdB * rng.randrange(1, order)
+    EQ = TwEdB * rng.randrange(1, order)
+    scalar = rng.randrange(1, order)
+
+    secret = rng.randrange(1, order)
+    digest = rng.randrange(1, order)
+    random_k = rng.randrange(1, order)
+    pubKey = Public_key(SWB, SWB * secret)
+    privKey = Private_key(pubKey, secret)
+    sig = privKey.sign(digest, random_k)
+
+    return [
+        ('python_ecdsa.Point.add', lambda: P + Q),
+        ('python_ecdsa.Point.scalar_mul', lambda: P * scalar),
+        ('python_ecdsa.PointEdwards.add', lambda: EP + EQ),
+        ('python_ecdsa.PointEdwards.scalar_mul', lambda: EP * scalar),
+        ('python_ecdsa.sign', lambda: privKey.sign(digest, random_k)),
+        ('python_ecdsa.verify', lambda: pubKey.verifies(digest, sig)),
+    ]
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+import constant_time
+import fixed_base
+import random
+import statistics
+import time
+
+# Compares how much the run time of base point multiplication depends on the scalar
+# for the variable-time fixed-base tables and the constant-time path used for secret scalars.
+# Scalars with very few and very many set bits are the extremes for the variable-time path,
+# and a constant-time path should show the same distribution of run times for every class.
+def main():
+    print("Benchmarking timing variance of scalar multiplication on the Baby Jubjub curve...")
+    rng = random.Random(0)
+    order = BabyJubjubPoint.prime_subgroup_order
+    bits = order.bit_length()
+    samples = 200
+
+    classes = {
+        'low weight': [(1 << rng.randrange(bits - 1)) | 1 for _ in range(samples)],
+        'high weight': [((1 << (bits - 1)) - 1) ^ (1 << rng.randrange(bits - 1)) for _ in range(samples)],
+        'random': [rng.randrange(1, order) for _ in range(samples)],
+    }
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        for name, mul in [('variable-time', fixed_base.base_mul), ('constant-time', constant_time.base_mul)]:
+            # Builds the tables before timing
+            mul(representation, 1)
+            times = _times(mul, representation, classes, rng)
+            medians = {}
+            for scalar_class, class_times in times.items():
+                medians[scalar_class] = statistics.median(class_times)
+                print(f"{representation.__name__} {name} {scalar_class}: "
+                      f"median {medians[scalar_class] * 1000:.2f} ms, stdev {statistics.stdev(class_times) * 1000:.3f} ms")
+            spread = (max(medians.values()) - min(medians.values())) / min(medians.values())
+            print(f"{representation.__name__} {name}: medians differ by {spread * 100:.1f}% across scalar classes\n")
+
+# Run time of every multiplication by scalar class, with the classes interleaved in a random order
+# so that drift in the speed of the machine affects them all equally
+def _times(mul, representation, classes, rng):
+    work = [(scalar_class, scalar) for scalar_class, scalars in classes.items() for scalar in scalars]
+    rng.shuffle(work)
+    times = {scalar_class: [] for scalar_class in classes}
+    for scalar_class, scalar in work:
+        start = time.perf_counter()
+        mul(representation, scalar)
+        times[scalar_class].append(time.perf_counter() - start)
+    return times
+
+if __name__ == '__main__':
+    main()
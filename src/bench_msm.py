@@ -0,0 +1,42 @@
+from baby_jubjub import BabyJubjubPoint, SWPoint, TwEdPoint
+from msm import straus_msm, pippenger_msm
+import random
+import time
+
+# Measures the number of points from which Pippenger's method beats Straus' method
+# The result is recorded as PIPPENGER_THRESHOLD in msm.py
+def main():
+    print("Benchmarking multi-scalar multiplication on the Baby Jubjub curve...")
+    rng = random.Random(0)
+    order = BabyJubjubPoint.prime_subgroup_order
+    sizes = [16, 32, 64, 128, 256, 512, 1024]
+
+    for representation in [SWPoint, TwEdPoint]:
+        base = representation.base()
+        points = [base.scalar_mul(rng.randrange(1, order)) for _ in range(sizes[-1])]
+        scalars = [rng.randrange(1, order) for _ in range(sizes[-1])]
+
+        crossover = None
+        for size in sizes:
+            straus, straus_time = _time(straus_msm, points[:size], scalars[:size])
+            pippenger, pippenger_time = _time(pippenger_msm, points[:size], scalars[:size])
+
+            assert(straus == pippenger)
+            if crossover is None and pippenger_time < straus_time:
+                crossover = size
+            print(f"{representation.__name__} n = {size}: Straus {straus_time * 1000:.1f} ms, Pippenger {pippenger_time * 1000:.1f} ms")
+
+        print(f"{representation.__name__}: Pippenger is faster from n = {crossover}\n")
+
+# Best of three runs
+def _time(f, points, scalars):
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        result = f(points, scalars)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+if __name__ == '__main__':
+    main()
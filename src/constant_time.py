@@ -0,0 +1,148 @@
+# Scalar multiplication for secret scalars, such as private keys and signing nonces
+# The variable-time methods used elsewhere skip zero digits and pick table entries by index, so their sequence of
+# operations depends on the bits of the scalar. Here every scalar of a given point goes through the same sequence:
+# - the scalar is recoded into a fixed number of signed odd digits, none of them zero
+# - every step is the same number of doublings and one complete Twisted Edwards addition
+# - table entries are read by scanning the whole table with arithmetic masks instead of indexing it
+# Python integers are not constant time themselves, so this removes the scalar-dependent control flow and memory
+# access pattern, not every timing difference. Verification works with public scalars and keeps the fast path.
+from algebra import integer_types
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+from conversions import convert
+
+# Window of the signed digits, the table holds the 2^(w - 1) odd multiples P, 3P, ..., (2^w - 1)P
+DEFAULT_WINDOW = 4
+
+p = BabyJubjubPoint.p
+A = TwEdPoint.A.value
+d = TwEdPoint.d.value
+
+# Extended Twisted Edwards coordinates as a tuple of integers (X, Y, Z, T)
+# Same formulas as TwEdPoint.__add__ and TwEdPoint.double, without the branches of the FElt operators
+def _add(P, Q):
+    X1, Y1, Z1, T1 = P
+    X2, Y2, Z2, T2 = Q
+    a = X1 * X2 % p
+    b = Y1 * Y2 % p
+    c = d * T1 % p * T2 % p
+    zz = Z1 * Z2 % p
+    e = ((X1 + Y1) * (X2 + Y2) - a - b) % p
+    f = (zz - c) % p
+    g = (zz + c) % p
+    h = (b - A * a) % p
+    return (e * f % p, g * h % p, f * g % p, e * h % p)
+
+def _double(P):
+    X1, Y1, Z1, _ = P
+    a = X1 * X1 % p
+    b = Y1 * Y1 % p
+    c = 2 * Z1 * Z1 % p
+    da = A * a % p
+    e = ((X1 + Y1) * (X1 + Y1) - a - b) % p
+    g = (da + b) % p
+    f = (g - c) % p
+    h = (da - b) % p
+    return (e * f % p, g * h % p, f * g % p, e * h % p)
+
+# Negates P when sign is 1, by selecting between x and p - x with a mask rather than a branch
+def _conditional_negate(P, sign):
+    X, Y, Z, T = P
+    mask = -sign
+    negX = (p - X) % p
+    negT = (p - T) % p
+    return (X ^ ((X ^ negX) & mask), Y, Z, T ^ ((T ^ negT) & mask))
+
+# Reads table[index] while touching every entry, mask is -1 for the wanted entry and 0 for the others
+def _lookup(table, index):
+    X = Y = Z = T = 0
+    for j, (Xj, Yj, Zj, Tj) in enumerate(table):
+        mask = ((j ^ index) - 1) >> 64
+        X |= Xj & mask
+        Y |= Yj & mask
+        Z |= Zj & mask
+        T |= Tj & mask
+    return (X, Y, Z, T)
+
+# Regular signed-digit recoding of an odd scalar, after Joye and Tunstall
+# Every digit is odd and in [-(2^w - 1), 2^w - 1], so no digit is zero and every step does the same work
+# The digit count depends only on the bit length, not on the value, and the digits are returned most significant first
+def _recode(scalar, window, bits):
+    digits = []
+    for _ in range(-(-bits // window)):
+        digit = (scalar & ((1 << (window + 1)) - 1)) - (1 << window)
+        digits.append(digit)
+        scalar = (scalar - digit) >> window
+    digits.append(scalar)
+    return digits[::-1]
+
+class ConstantTimeTable:
+    def __init__(self, point, window=DEFAULT_WINDOW, bits=None):
+        if window < 1:
+            raise ValueError("Window must be positive.")
+        self.representation = point.__class__
+        assert(self.representation in [SWPoint, MontPoint, TwEdPoint])
+        self.window = window
+        self.bits = BabyJubjubPoint.order.bit_length() if bits is None else bits
+
+        # Montgomery and Short Weierstrass points are multiplied in Twisted Edwards form, whose addition is complete
+        pt = convert(point, TwEdPoint)
+        self.point = (pt.X.value, pt.Y.value, pt.Z.value, pt.T.value)
+        double = _double(self.point)
+        self.table = [self.point]
+        for _ in range((1 << (window - 1)) - 1):
+            self.table.append(_add(self.table[-1], double))
+
+    def scalar_mul(self, scalar):
+        if not isinstance(scalar, integer_types):
+            raise TypeError("Scalar must be an integer.")
+        if scalar < 0:
+            raise ValueError("Scalar must be non-negative.")
+        if scalar.bit_length() > self.bits:
+            raise ValueError(f"Scalar must be at most {self.bits} bits.")
+
+        # The recoding needs an odd scalar, so an even scalar k is computed as (k + 1) * P - P
+        even = 1 - (scalar & 1)
+        digits = _recode(scalar + even, self.window, self.bits + 1)
+
+        result = _lookup(self.table, (digits[0] - 1) >> 1)
+        for digit in digits[1:]:
+            for _ in range(self.window):
+                result = _double(result)
+            sign = (digit >> (self.window + 1)) & 1
+            magnitude = (digit ^ -sign) + sign
+            result = _add(result, _conditional_negate(_lookup(self.table, (magnitude - 1) >> 1), sign))
+
+        # Adds -P for even scalars and the identity otherwise
+        identity = (0, 1, 1, 0)
+        correction = _lookup([identity, _conditional_negate(self.point, 1)], even)
+        X, Y, Z, T = _add(result, correction)
+
+        Fr = BabyJubjubPoint.Fr
+        result = TwEdPoint.from_extended(Fr._new(X), Fr._new(Y), Fr._new(Z), Fr._new(T))
+        # Converted directly rather than through the conversion cache, which should not hold secret-dependent points
+        if self.representation == TwEdPoint:
+            return result
+        if self.representation == MontPoint:
+            return result.to_montgomery()
+        return result.to_montgomery().to_short_weierstrass()
+
+# Tables of the base point, built lazily the first time each representation is used
+_base_tables = {}
+
+# Multiplies the base point by a secret scalar, the counterpart of fixed_base.base_mul
+def base_mul(representation, scalar):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    if not isinstance(scalar, integer_types):
+        raise TypeError("Scalar must be an integer.")
+    if scalar < 0:
+        raise ValueError("Scalar must be non-negative.")
+    if representation not in _base_tables:
+        _base_tables[representation] = ConstantTimeTable(
+            representation.base(), bits=BabyJubjubPoint.prime_subgroup_order.bit_length()
+        )
+    # The base point generates the prime order subgroup
+    return _base_tables[representation].scalar_mul(scalar % BabyJubjubPoint.prime_subgroup_order)
+
+# Multiplies any point by a secret scalar
+def scalar_mul(point, scalar, window=DEFAULT_WINDOW):
+    return ConstantTimeTable(point, window).scalar_mul(scalar)
@@ -0,0 +1,68 @@
+# Cached conversions between the Short Weierstrass, Montgomery and Twisted Edwards forms of Baby Jubjub points
+# A conversion costs one or two field inversions, and the same public keys tend to be converted again and again,
+# so converted points are kept in an LRU cache keyed by (representation, x, y).
+# All forms of a point that have been computed share one dictionary, which is also attached to the points
+# themselves, so a public key that has been converted once carries its other forms with it.
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from lru_cache import LRUCache
+
+# Number of points whose forms are kept, every form of a point counts separately
+DEFAULT_CACHE_SIZE = 4096
+
+# Conversions between adjacent forms, Short Weierstrass and Twisted Edwards are converted through Montgomery form
+_steps = {
+    (SWPoint, MontPoint): SWPoint.to_montgomery,
+    (MontPoint, SWPoint): MontPoint.to_short_weierstrass,
+    (MontPoint, TwEdPoint): MontPoint.to_twisted_edwards,
+    (TwEdPoint, MontPoint): TwEdPoint.to_montgomery,
+}
+
+_cache = LRUCache(DEFAULT_CACHE_SIZE)
+
+# Sets the number of points kept, evicting the least recently used ones if the cache shrinks
+def set_cache_size(size):
+    _cache.resize(size)
+
+# Size, hits, misses, evictions and hit rate of the cache
+# Only points that do not already carry their forms are looked up, so conversions of the same object count once
+def cache_stats():
+    return _cache.stats()
+
+# Empties the cache and resets its counters, forms already attached to points are kept
+def clear_cache():
+    _cache.clear()
+
+def _key(point):
+    return (point.__class__, point.x.value, point.y.value)
+
+# Converts a point to the given representation
+def convert(point, representation):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    source = point.__class__
+    assert(source in [SWPoint, MontPoint, TwEdPoint])
+    if source == representation:
+        return point
+    # The point at infinity has no affine coordinates to use as a key, and converting it costs nothing
+    if point.is_infinity():
+        return representation.infinity()
+
+    # Forms carried by the point are used without a cache lookup
+    forms = getattr(point, '_forms', None)
+    if forms is None:
+        forms = _cache.get(_key(point))
+        if forms is None:
+            forms = {source: point}
+
+    if representation not in forms:
+        path = [representation] if MontPoint in (source, representation) else [MontPoint, representation]
+        pt = point
+        for step in path:
+            if step not in forms:
+                forms[step] = _steps[(pt.__class__, step)](pt)
+            pt = forms[step]
+        for pt in forms.values():
+            _cache.put(_key(pt), forms)
+
+    for pt in forms.values():
+        pt._forms = forms
+    return forms[representation]
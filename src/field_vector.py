@@ -0,0 +1,291 @@
+# Vectorized field arithmetic over NumPy arrays, for bulk operations on many points at once
+# Requires numpy, installed with the numpy extra, which the rest of the package does not depend on
+#
+# A FieldVector stores n field elements in Montgomery form as an (L, n) uint64 array of 28-bit limbs.
+# NumPy has no 64 x 64 -> 128 bit product, so limbs are kept at 28 bits: a limb product fits in 56 bits and
+# the partial sums of a whole Montgomery multiplication fit in 64 bits without intermediate carry handling.
+# Every operation works on all n elements at once, and vectors of length 1 broadcast against longer ones.
+import numpy as np
+from algebra import GF
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+
+LIMB_BITS = 28
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# Constants of Montgomery arithmetic modulo an odd prime, using R = 2^(28 * L)
+class _MontgomeryParams:
+    def __init__(self, order):
+        self.order = order
+        self.num_limbs = -(-(order.bit_length() + 2) // LIMB_BITS)
+        self.R = 1 << (LIMB_BITS * self.num_limbs)
+        self.R2 = self.R * self.R % order
+        # -order^-1 mod 2^28
+        self.order_neg_inv = (-pow(order, -1, 1 << LIMB_BITS)) % (1 << LIMB_BITS)
+        self.order_limbs = _to_limbs([order], self.num_limbs)
+
+_params = {}
+
+def _get_params(field):
+    if field.order not in _params:
+        _params[field.order] = _MontgomeryParams(int(field.order))
+    return _params[field.order]
+
+# Splits non-negative integers below 2^256 into an (L, n) array of 28-bit limbs
+def _to_limbs(values, num_limbs):
+    raw = b''.join([value.to_bytes(32, 'little') for value in values])
+    words = np.frombuffer(raw, dtype='<u8').reshape(len(values), 4).T
+    limbs = np.zeros((num_limbs, len(values)), dtype=np.uint64)
+    for i in range(num_limbs):
+        bit = i * LIMB_BITS
+        word, shift = divmod(bit, 64)
+        if word >= 4:
+            break
+        limb = words[word] >> np.uint64(shift)
+        if shift + LIMB_BITS > 64 and word + 1 < 4:
+            limb = limb | (words[word + 1] << np.uint64(64 - shift))
+        limbs[i] = limb & np.uint64(LIMB_MASK)
+    return limbs
+
+# Inverse of _to_limbs for fully carried limbs
+def _from_limbs(limbs):
+    values = [0] * limbs.shape[1]
+    for i in reversed(range(limbs.shape[0])):
+        row = limbs[i].tolist()
+        values = [(value << LIMB_BITS) | limb for value, limb in zip(values, row)]
+    return values
+
+# Propagates carries so that every limb is below 2^28, the top limb keeps any excess
+def _carry(limbs):
+    for i in range(limbs.shape[0] - 1):
+        limbs[i + 1] += limbs[i] >> np.uint64(LIMB_BITS)
+        limbs[i] &= np.uint64(LIMB_MASK)
+    return limbs
+
+# Computes a - b on carried limbs, returning the difference and a mask of the elements where a < b
+def _sub_limbs(a, b):
+    num_limbs = max(a.shape[0], b.shape[0])
+    n = max(a.shape[1], b.shape[1])
+    diff = np.zeros((num_limbs, n), dtype=np.int64)
+    borrow = np.zeros(n, dtype=np.int64)
+    for i in range(num_limbs):
+        ai = a[i].astype(np.int64) if i < a.shape[0] else 0
+        bi = b[i].astype(np.int64) if i < b.shape[0] else 0
+        d = ai - bi - borrow
+        borrow = (d < 0).astype(np.int64)
+        diff[i] = d + (borrow << LIMB_BITS)
+    return diff.astype(np.uint64), borrow.astype(bool)
+
+# Subtracts the modulus from every element that is at least the modulus, for elements below twice the modulus
+def _reduce_once(limbs, params):
+    diff, below = _sub_limbs(limbs, params.order_limbs)
+    return np.where(below, limbs, diff)[:params.num_limbs]
+
+# Montgomery multiplication a * b / R mod order
+def _mont_mul(a, b, params):
+    num_limbs = params.num_limbs
+    n = max(a.shape[1], b.shape[1])
+    order_limbs = params.order_limbs
+    neg_inv = np.uint64(params.order_neg_inv)
+    mask = np.uint64(LIMB_MASK)
+    shift = np.uint64(LIMB_BITS)
+
+    t = np.zeros((2 * num_limbs + 1, n), dtype=np.uint64)
+    for i in range(num_limbs):
+        window = t[i:i + num_limbs]
+        window += a[i] * b
+        m = ((t[i] & mask) * neg_inv) & mask
+        window += m * order_limbs
+        t[i + 1] += t[i] >> shift
+    return _reduce_once(_carry(t[num_limbs:]), params)
+
+class FieldVector:
+    def __init__(self, field, limbs):
+        if not isinstance(field, GF):
+            raise ValueError('Field must be an instance of GaloisField')
+        self.field = field
+        self.params = _get_params(field)
+        self.limbs = limbs
+
+    def from_ints(field, values):
+        params = _get_params(field)
+        for value in values:
+            if value < 0 or value >= field.order:
+                raise ValueError('Values must be in the field')
+        limbs = _to_limbs(values, params.num_limbs)
+        return FieldVector(field, _mont_mul(limbs, _to_limbs([params.R2], params.num_limbs), params))
+
+    def from_elements(elements):
+        if len(elements) == 0:
+            raise ValueError('Must have at least one element')
+        return FieldVector.from_ints(elements[0].field, [element.value for element in elements])
+
+    def to_ints(self):
+        one = _to_limbs([1], self.params.num_limbs)
+        return _from_limbs(_mont_mul(self.limbs, one, self.params))
+
+    def to_elements(self):
+        return [self.field(value) for value in self.to_ints()]
+
+    def __len__(self):
+        return self.limbs.shape[1]
+
+    def _check(self, other):
+        if self.field.order != other.field.order:
+            raise TypeError('Cannot combine vectors from different fields')
+
+    def __add__(self, other):
+        self._check(other)
+        return FieldVector(self.field, _reduce_once(_carry(self.limbs + other.limbs), self.params))
+
+    def __sub__(self, other):
+        self._check(other)
+        diff, below = _sub_limbs(self.limbs, other.limbs)
+        wrapped = _carry(diff + self.params.order_limbs)
+        wrapped[-1] &= np.uint64(LIMB_MASK)
+        return FieldVector(self.field, np.where(below, wrapped, diff))
+
+    def __mul__(self, other):
+        self._check(other)
+        return FieldVector(self.field, _mont_mul(self.limbs, other.limbs, self.params))
+
+    def __truediv__(self, other):
+        return self * other.batch_inverse()
+
+    def __neg__(self):
+        return FieldVector(self.field, np.zeros_like(self.limbs)) - self
+
+    # Elementwise equality as a boolean array
+    def equals(self, other):
+        self._check(other)
+        return np.all(self.limbs == other.limbs, axis=0)
+
+    def is_zero(self):
+        return np.all(self.limbs == 0, axis=0)
+
+    # Inverts every element, zero maps to zero like division by zero does for FElt
+    # Uses a product tree, so n inversions cost a single exponentiation and about 3n vectorized multiplications
+    def batch_inverse(self):
+        params = self.params
+        zero = self.is_zero()
+        one = _mont_mul(_to_limbs([1], params.num_limbs), _to_limbs([params.R2], params.num_limbs), params)
+        level = np.where(zero, one, self.limbs)
+
+        levels = []
+        while level.shape[1] > 1:
+            if level.shape[1] % 2 == 1:
+                level = np.concatenate([level, one], axis=1)
+            levels.append(level)
+            level = _mont_mul(level[:, 0::2], level[:, 1::2], params)
+
+        # The root holds a * R for the product a, its inverse in Montgomery form is a^-1 * R = R^2 / (a * R)
+        root = _from_limbs(level)[0]
+        inv = _to_limbs([params.R * params.R % params.order * pow(root, -1, params.order) % params.order], params.num_limbs)
+        for level in reversed(levels):
+            parents = np.repeat(inv[:, :level.shape[1] // 2], 2, axis=1)
+            siblings = np.empty_like(level)
+            siblings[:, 0::2] = level[:, 1::2]
+            siblings[:, 1::2] = level[:, 0::2]
+            inv = _mont_mul(parents, siblings, params)
+
+        inv = inv[:, :self.limbs.shape[1]]
+        return FieldVector(self.field, np.where(zero, self.limbs, inv))
+
+    def constant(field, value):
+        return FieldVector.from_ints(field, [value % field.order])
+
+# Many points of one representation, stored as coordinate vectors
+# Points at infinity cannot be stored, as they have no affine coordinates in Short Weierstrass or Montgomery form
+class PointVector:
+    def __init__(self, representation, xs, ys):
+        assert(representation in [SWPoint, MontPoint, TwEdPoint])
+        if len(xs) != len(ys):
+            raise ValueError("Must have the same number of x and y coordinates.")
+        self.representation = representation
+        self.xs = xs
+        self.ys = ys
+
+    def from_points(points):
+        if len(points) == 0:
+            raise ValueError("Must have at least one point.")
+        representation = points[0].__class__
+        for pt in points:
+            if not isinstance(pt, representation):
+                raise TypeError("All points must be in the same representation.")
+            if representation != TwEdPoint and pt.is_infinity():
+                raise ValueError("Points at infinity cannot be stored in a PointVector.")
+        Fr = representation.Fr
+        return PointVector(
+            representation,
+            FieldVector.from_ints(Fr, [pt.x.value for pt in points]),
+            FieldVector.from_ints(Fr, [pt.y.value for pt in points]),
+        )
+
+    def to_points(self):
+        return [self.representation(x, y) for x, y in zip(self.xs.to_ints(), self.ys.to_ints())]
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _constant(self, value):
+        return FieldVector.constant(self.representation.Fr, value.value)
+
+    def is_on_curve(self):
+        x = self.xs
+        y = self.ys
+        if self.representation == SWPoint:
+            lhs = y * y
+            rhs = x * x * x + self._constant(SWPoint.a) * x + self._constant(SWPoint.b)
+        elif self.representation == MontPoint:
+            lhs = self._constant(MontPoint.B) * y * y
+            rhs = x * x * x + self._constant(MontPoint.A) * x * x + x
+        else:
+            xx = x * x
+            yy = y * y
+            lhs = self._constant(TwEdPoint.A) * xx + yy
+            rhs = self._constant(TwEdPoint.Fr.one) + self._constant(TwEdPoint.d) * xx * yy
+        return lhs.equals(rhs)
+
+    def to_montgomery(self):
+        if self.representation == MontPoint:
+            return self
+        if self.representation == SWPoint:
+            return PointVector(MontPoint, self.xs - self._constant(MontPoint.alpha), self.ys)
+
+        # The identity (0, 1) maps to the point at infinity, which a PointVector cannot hold
+        # The other point with x = 0, (0, -1) of order 2, maps to (0, 0) as the batch inversion leaves x = 0 at zero
+        one = self._constant(TwEdPoint.Fr.one)
+        if np.any(self.xs.is_zero() & self.ys.equals(one)):
+            raise ValueError("The identity has no affine Montgomery coordinates.")
+        n = len(self)
+        # Both denominators are inverted with one batch inversion
+        denominators = FieldVector(TwEdPoint.Fr, np.concatenate([(one - self.ys).limbs, ((one - self.ys) * self.xs).limbs], axis=1))
+        inverses = denominators.batch_inverse()
+        numerator = one + self.ys
+        nx = numerator * FieldVector(TwEdPoint.Fr, inverses.limbs[:, :n])
+        ny = numerator * FieldVector(TwEdPoint.Fr, inverses.limbs[:, n:])
+        return PointVector(MontPoint, nx, ny)
+
+    def to_twisted_edwards(self):
+        if self.representation == TwEdPoint:
+            return self
+        if self.representation == SWPoint:
+            return self.to_montgomery().to_twisted_edwards()
+
+        one = self._constant(MontPoint.Fr.one)
+        n = len(self)
+        denominators = FieldVector(MontPoint.Fr, np.concatenate([self.ys.limbs, (self.xs + one).limbs], axis=1))
+        inverses = denominators.batch_inverse()
+        nx = self.xs * FieldVector(MontPoint.Fr, inverses.limbs[:, :n])
+        ny = (self.xs - one) * FieldVector(MontPoint.Fr, inverses.limbs[:, n:])
+        return PointVector(TwEdPoint, nx, ny)
+
+    def to_short_weierstrass(self):
+        if self.representation == SWPoint:
+            return self
+        if self.representation == TwEdPoint:
+            return self.to_montgomery().to_short_weierstrass()
+
+        B_inv = self._constant(MontPoint.Fr.one / MontPoint.B)
+        nx = (self.xs + self._constant(MontPoint.alpha)) * B_inv
+        ny = self.ys * B_inv
+        return PointVector(SWPoint, nx, ny)
@@ -0,0 +1,145 @@
+# Fixed-base scalar multiplication using precomputed window tables
+# For a window of w bits, the table for a point P holds j * 2^(w * i) * P for every window i and digit j < 2^w,
+# so multiplying P by a scalar is one table lookup and at most one addition per window, with no doublings
+from algebra import integer_types
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+from conversions import convert
+from lru_cache import LRUCache
+
+# Window size of the base point tables, a table holds about (256 / w) * 2^w points
+DEFAULT_WINDOW = 6
+
+class FixedBaseTable:
+    def __init__(self, point, window, bits):
+        if window < 1:
+            raise ValueError("Window must be positive.")
+        self.point = point
+        self.window = window
+        self.bits = bits
+        self.rows = []
+
+        row_base = point
+        for _ in range(-(-bits // window)):
+            # The zero digit is skipped during multiplication, so its entry is never read
+            row = [None, row_base]
+            for _ in range(2, 1 << window):
+                row.append(row[-1] + row_base)
+            self.rows.append(row)
+            row_base = row[-1] + row_base
+        # Affine table entries make every addition during multiplication cheaper
+        point.__class__.normalize_batch([pt for row in self.rows for pt in row[1:]])
+
+    # With normalize=False the result may be left in projective coordinates, for callers that normalize many at once
+    def scalar_mul(self, scalar, normalize=True):
+        if not isinstance(scalar, integer_types):
+            raise TypeError("Scalar must be an integer.")
+        if scalar < 0:
+            raise ValueError("Scalar must be non-negative.")
+        if scalar.bit_length() > self.bits:
+            raise ValueError(f"Scalar must be at most {self.bits} bits.")
+
+        mask = (1 << self.window) - 1
+        result = None
+        for row in self.rows:
+            digit = scalar & mask
+            scalar >>= self.window
+            if digit != 0:
+                result = row[digit] if result is None else result + row[digit]
+            if scalar == 0:
+                break
+
+        if result is None:
+            return self.point.__class__.infinity()
+        if normalize:
+            result._normalize()
+        return result
+
+window = DEFAULT_WINDOW
+# Base point tables, built lazily the first time each representation is used
+_base_tables = {}
+
+# Sets the window size of the base point tables, dropping any tables already built
+def set_window(new_window):
+    global window
+    if new_window < 1:
+        raise ValueError("Window must be positive.")
+    window = new_window
+    _base_tables.clear()
+
+def base_table(representation):
+    assert(representation in [SWPoint, TwEdPoint])
+    if representation not in _base_tables:
+        _base_tables[representation] = FixedBaseTable(
+            representation.base(), window, BabyJubjubPoint.prime_subgroup_order.bit_length()
+        )
+    return _base_tables[representation]
+
+# Multiplies the base point of the given representation by scalar
+def base_mul(representation, scalar):
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    if not isinstance(scalar, integer_types):
+        raise TypeError("Scalar must be an integer.")
+    if scalar < 0:
+        raise ValueError("Scalar must be non-negative.")
+
+    # The base point generates the prime order subgroup
+    scalar = scalar % BabyJubjubPoint.prime_subgroup_order
+    # Affine Montgomery additions each need an inversion, so the Twisted Edwards table is used instead
+    # and the result is mapped back, which only costs the inversions of a single conversion
+    if representation == MontPoint:
+        return base_table(TwEdPoint).scalar_mul(scalar).to_montgomery()
+    return base_table(representation).scalar_mul(scalar)
+
+# Window size of public key tables. A public key table has to pay for itself over far fewer multiplications than
+# the base point tables, and with this window it does after about ten
+PREPARED_WINDOW = 4
+# Number of prepared public keys kept by prepare. With the default window a prepared key takes about 330 KB in
+# Short Weierstrass form and 430 KB in Montgomery or Twisted Edwards form (somewhat less with gmpy2), so the full
+# cache takes up to about 28 MB. Size it with set_prepared_cache_size to the number of keys verified against often.
+PREPARED_CACHE_SIZE = 64
+
+# A public key together with a window table of its multiples, so that multiplying it needs no doublings
+# Accepted by the ECDSA functions wherever a public key is, for signers that are verified against repeatedly
+class PreparedPublicKey:
+    def __init__(self, point, window=PREPARED_WINDOW):
+        assert(point.__class__ in [SWPoint, MontPoint, TwEdPoint])
+        self.point = point
+        self.representation = point.__class__
+        # Montgomery keys use a table of their Twisted Edwards form, like base_mul does for the base point
+        table_point = convert(point, TwEdPoint) if self.representation == MontPoint else point
+        self.table = FixedBaseTable(table_point, window, BabyJubjubPoint.order.bit_length())
+
+    # The public key need not be in the prime order subgroup, so the scalar is only reduced by the full curve order
+    def scalar_mul(self, scalar):
+        if not isinstance(scalar, integer_types):
+            raise TypeError("Scalar must be an integer.")
+        if scalar < 0:
+            raise ValueError("Scalar must be non-negative.")
+        result = self.table.scalar_mul(scalar % BabyJubjubPoint.order)
+        if self.representation == MontPoint:
+            return result.to_montgomery()
+        return result
+
+_prepared_keys = LRUCache(PREPARED_CACHE_SIZE)
+
+# Returns the prepared form of a public key, building its table only if the key is not already cached
+def prepare(pubKey):
+    if isinstance(pubKey, PreparedPublicKey):
+        return pubKey
+    key = (pubKey.__class__, pubKey.x.value, pubKey.y.value)
+    prepared = _prepared_keys.get(key)
+    if prepared is None:
+        prepared = PreparedPublicKey(pubKey)
+        _prepared_keys.put(key, prepared)
+    return prepared
+
+# Sets the number of prepared public keys kept, evicting the least recently used ones if the cache shrinks
+def set_prepared_cache_size(size):
+    _prepared_keys.resize(size)
+
+# Size, hits, misses, evictions and hit rate of the prepared public key cache
+def prepared_cache_stats():
+    return _prepared_keys.stats()
+
+def clear_prepared_cache():
+    _prepared_keys.clear()
@@ -0,0 +1,158 @@
+# Opt-in counters of field and curve operations, for finding out what each high-level call costs
+# While enabled, the counted methods of FElt, GF and the point classes are replaced by wrappers that record every call,
+# and the ECDSA functions and conversions are wrapped so that their operations are attributed to them.
+# Disabling restores the original methods, so the layer has no overhead at all while it is off.
+#
+#   with instrumentation.enabled():
+#       verify(SWPoint, digest, pubKey, r, s)
+#   instrumentation.snapshot()['labels']['verify']   # {'calls': 1, 'Fr.mul': ..., 'Fr.inv': ..., 'Fn.mul': ..., ...}
+#
+# Field operations are counted per field: Fr is the base field of the curve, whose arithmetic the curve operations
+# cost, and Fn is the field modulo the prime subgroup order, used by ECDSA itself. Any other field is named GF(order).
+# Counts are inclusive: an operation counts towards every label that is active when it runs, so the counts of sign
+# include the conversion it makes. Labels are tracked per thread, so the operations of another thread, such as the
+# refill thread of a NoncePool, count towards the totals but not towards the labels active in this one.
+# Only operations on FElt values are seen, arithmetic done on plain integers (the Montgomery ladder's swaps,
+# constant_time, field_vector) is not. Names imported with from ... import before enable keep referring to the
+# unwrapped functions, and worker processes keep their own counters.
+from collections import Counter
+from contextlib import contextmanager
+import functools
+import threading
+from algebra import FElt, GF
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+import baby_jubjub_ecdsa
+import conversions
+
+totals = Counter()
+# Counters of every label, each including the number of calls made under it
+labels = {}
+# Labels of the calls currently in progress in each thread, innermost last
+_local = threading.local()
+# Counter updates are not atomic, and the counters are shared by every thread
+_lock = threading.Lock()
+# (owner, attribute, original) of every method replaced by enable
+_patched = []
+_field_names = {BabyJubjubPoint.Fr.order: 'Fr', baby_jubjub_ecdsa.Fn.order: 'Fn'}
+
+def _field_name(field):
+    return _field_names.get(field.order, f'GF({field.order})')
+
+def is_enabled():
+    return len(_patched) > 0
+
+def _active():
+    if not hasattr(_local, 'labels'):
+        _local.labels = []
+    return _local.labels
+
+def _record(operation, count=1):
+    active = set(_active())
+    with _lock:
+        totals[operation] += count
+        for label in active:
+            labels[label][operation] += count
+
+# Attributes the operations in the block to label, can be used directly to profile any piece of code
+@contextmanager
+def profile(label):
+    with _lock:
+        if label not in labels:
+            labels[label] = Counter()
+        labels[label]['calls'] += 1
+    active = _active()
+    active.append(label)
+    try:
+        yield
+    finally:
+        active.pop()
+
+# Field element methods are counted under the name of the field of the element they are called on
+def _counted(method, operations):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        name = _field_name(self.field)
+        for operation in operations:
+            _record(f'{name}.{operation}')
+        return method(self, *args, **kwargs)
+    return wrapper
+
+# Point methods are counted under the name of the class they are called on, so inherited methods are told apart
+def _counted_point(method, operation):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _record(f'{self.__class__.__name__}.{operation}')
+        return method(self, *args, **kwargs)
+    return wrapper
+
+# Montgomery's trick makes a batch inversion cost one inversion and 3(n - 1) multiplications
+def _counted_batch_inverse(method):
+    @functools.wraps(method)
+    def wrapper(self, elements):
+        elements = list(elements)
+        name = _field_name(self)
+        _record(f'{name}.inv')
+        _record(f'{name}.mul', 3 * max(len(elements) - 1, 0))
+        return method(self, elements)
+    return wrapper
+
+def _profiled(function, label):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with profile(label):
+            return function(*args, **kwargs)
+    return wrapper
+
+def _patch(owner, attribute, wrap):
+    original = owner.__dict__[attribute]
+    _patched.append((owner, attribute, original))
+    setattr(owner, attribute, wrap(original))
+
+def enable():
+    if is_enabled():
+        return
+    _patch(FElt, '__mul__', lambda method: _counted(method, ['mul']))
+    _patch(FElt, '__truediv__', lambda method: _counted(method, ['inv', 'mul']))
+    _patch(FElt, 'sqrt', lambda method: _counted(method, ['sqrt']))
+    _patch(FElt, 'is_square', lambda method: _counted(method, ['legendre']))
+    _patch(GF, 'batch_inverse', _counted_batch_inverse)
+
+    for representation in [BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint]:
+        for attribute, operation in [('__add__', 'add'), ('double', 'double'), ('is_on_curve', 'validation')]:
+            if attribute in representation.__dict__:
+                _patch(representation, attribute, lambda method, operation=operation: _counted_point(method, operation))
+        for attribute in ['to_short_weierstrass', 'to_montgomery', 'to_twisted_edwards']:
+            if attribute in representation.__dict__:
+                label = f'{representation.__name__}.{attribute}'
+                _patch(representation, attribute, lambda function, label=label: _profiled(function, label))
+
+    for name in ['keygen', 'sign', 'sign_recoverable', 'verify', 'verify_with_advice', 'recover_public_key', 'verify_batch']:
+        _patch(baby_jubjub_ecdsa, name, lambda function, name=name: _profiled(function, name))
+    _patch(conversions, 'convert', lambda function: _profiled(function, 'convert'))
+
+def disable():
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+
+@contextmanager
+def enabled():
+    already_enabled = is_enabled()
+    enable()
+    try:
+        yield
+    finally:
+        if not already_enabled:
+            disable()
+
+def reset():
+    with _lock:
+        totals.clear()
+        labels.clear()
+
+# All counters as plain dictionaries, for exporting to a metrics system
+def snapshot():
+    return {
+        'totals': dict(totals),
+        'labels': {label: dict(counts) for label, counts in labels.items()},
+    }
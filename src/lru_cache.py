@@ -0,0 +1,58 @@
+# A size-bounded mapping that evicts its least recently used entry, with counters for tuning its size
+from collections import OrderedDict
+
+class LRUCache:
+    def __init__(self, max_size):
+        if max_size < 0:
+            raise ValueError("Maximum size cannot be negative.")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Returns the cached value and marks it as recently used, or None on a miss
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.max_size == 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    # Shrinks the cache straight away if the new size is smaller
+    def resize(self, max_size):
+        if max_size < 0:
+            raise ValueError("Maximum size cannot be negative.")
+        self.max_size = max_size
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
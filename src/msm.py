@@ -0,0 +1,109 @@
+# Multi-scalar multiplication, computing s_1 * P_1 + ... + s_n * P_n
+from algebra import integer_types
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint, wnaf
+
+# Number of points from which Pippenger's method beats Straus' method, as measured by bench_msm.py
+PIPPENGER_THRESHOLD = 256
+
+def multi_scalar_mul(points, scalars):
+    if len(points) >= PIPPENGER_THRESHOLD:
+        return pippenger_msm(points, scalars)
+    return straus_msm(points, scalars)
+
+def _check_inputs(points, scalars):
+    if len(points) != len(scalars):
+        raise ValueError("Must have the same number of points and scalars.")
+    if len(points) == 0:
+        raise ValueError("Must have at least one point.")
+    representation = points[0].__class__
+    assert(representation in [SWPoint, MontPoint, TwEdPoint])
+    for pt, scalar in zip(points, scalars):
+        if not isinstance(pt, representation):
+            raise TypeError("All points must be in the same representation.")
+        if not isinstance(scalar, integer_types):
+            raise TypeError("Scalar must be an integer.")
+        if scalar < 0:
+            raise ValueError("Scalar must be non-negative.")
+    return representation
+
+# Straus' method with interleaved wNAF windows
+# Every point gets its own table of odd multiples, but all of the points share a single chain of doublings,
+# so the cost is one scalar multiplication's worth of doublings plus the additions for each scalar
+def straus_msm(points, scalars, width=None):
+    representation = _check_inputs(points, scalars)
+
+    # Affine Montgomery additions each need an inversion, so the sum is computed in Twisted Edwards form
+    if representation == MontPoint:
+        return straus_msm([pt.to_twisted_edwards() for pt in points], scalars, width).to_montgomery()
+
+    if width is None:
+        width = BabyJubjubPoint.wnaf_width
+    if width < 2:
+        raise ValueError("Window width must be at least 2.")
+    terms = [(wnaf(scalar, width), pt._odd_multiples(width)) for pt, scalar in zip(points, scalars) if scalar != 0]
+
+    result = None
+    for i in reversed(range(max([len(digits) for digits, _ in terms], default=0))):
+        if result is not None:
+            result = result.double()
+        for digits, table in terms:
+            if i >= len(digits) or digits[i] == 0:
+                continue
+            digit = digits[i]
+            term = table[digit // 2] if digit > 0 else -table[-digit // 2]
+            result = term if result is None else result + term
+
+    if result is None:
+        return representation.infinity()
+    result._normalize()
+    return result
+
+# Pippenger's bucket method
+# The scalars are cut into windows of c bits. For each window every point is added into the bucket of its digit,
+# and the buckets are combined with a running sum, so a window costs about n + 2^(c+1) additions for n points
+# and all windows share c doublings each
+def pippenger_msm(points, scalars, window=None):
+    representation = _check_inputs(points, scalars)
+
+    # Affine Montgomery additions each need an inversion, so the sum is computed in Twisted Edwards form
+    if representation == MontPoint:
+        return pippenger_msm([pt.to_twisted_edwards() for pt in points], scalars, window).to_montgomery()
+
+    bits = max([scalar.bit_length() for scalar in scalars])
+    if window is None:
+        window = _pippenger_window(len(points), bits)
+    if window < 1:
+        raise ValueError("Window must be positive.")
+    mask = (1 << window) - 1
+
+    result = None
+    for start in reversed(range(0, bits, window)):
+        if result is not None:
+            for _ in range(window):
+                result = result.double()
+
+        buckets = [None] * mask
+        for pt, scalar in zip(points, scalars):
+            digit = (scalar >> start) & mask
+            if digit != 0:
+                buckets[digit - 1] = pt if buckets[digit - 1] is None else buckets[digit - 1] + pt
+
+        # Bucket j holds the points with digit j + 1, summing the running sums weights each bucket by its digit
+        running = None
+        window_sum = None
+        for bucket in reversed(buckets):
+            if bucket is not None:
+                running = bucket if running is None else running + bucket
+            if running is not None:
+                window_sum = running if window_sum is None else window_sum + running
+        if window_sum is not None:
+            result = window_sum if result is None else result + window_sum
+
+    if result is None:
+        return representation.infinity()
+    result._normalize()
+    return result
+
+# Window size that minimizes the number of additions for n points and scalars of the given bit length
+def _pippenger_window(n, bits):
+    return min(range(1, 17), key=lambda c: -(-bits // c) * (n + (1 << (c + 1))))
@@ -0,0 +1,137 @@
+# A pool of precomputed signing nonces for low-latency ECDSA over Baby Jubjub
+# Almost all the work of signing is computing R = kG, which does not depend on the message. The pool precomputes
+# (k, r, k^-1 mod n) triples in a background thread while the signer is idle, so that sign_with_pool only has a few
+# multiplications modulo n left to do. Pure Python arithmetic holds the GIL, so the refill thread does not add
+# throughput, it moves the work of signing out of the latency of individual requests.
+from collections import deque
+import secrets
+import threading
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from fixed_base import base_mul
+from constant_time import base_mul as constant_time_base_mul
+from baby_jubjub_ecdsa import Fn, order
+
+DEFAULT_SIZE = 256
+
+class NoncePool:
+    def __init__(self, representation, size=DEFAULT_SIZE, refill_threshold=None, constant_time=False):
+        assert(representation in [SWPoint, MontPoint, TwEdPoint])
+        if size < 1:
+            raise ValueError("Pool size must be positive.")
+        # By default refilling starts once a quarter of the pool is left
+        if refill_threshold is None:
+            refill_threshold = size // 4
+        if refill_threshold < 0 or refill_threshold >= size:
+            raise ValueError("Refill threshold must be in the range [0, size - 1].")
+        self.representation = representation
+        self.size = size
+        self.refill_threshold = refill_threshold
+        self.constant_time = constant_time
+
+        self.nonces = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = None
+
+        # Depletion metrics
+        self.generated = 0
+        self.taken = 0
+        self.misses = 0
+        # Fewest nonces left in the pool after any take, None before the first take
+        self.low_water = None
+
+    def start(self):
+        with self.condition:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._refill, name='NoncePool', daemon=True)
+            self.thread.start()
+
+    # Stops the refill thread and discards every nonce left in the pool
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.nonces.clear()
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # Removes a triple from the pool, each triple is handed out exactly once
+    # When the pool is empty the triple is computed on the spot, which is counted as a miss
+    # take does not start the refill thread, so a pool that was never started computes every triple inline and
+    # every take is a miss. Starting the thread is left to start or the with statement, which also stop it again.
+    def take(self):
+        with self.condition:
+            if self.closed:
+                raise ValueError("Nonce pool is closed.")
+            self.taken += 1
+            if self.nonces:
+                nonce = self.nonces.popleft()
+            else:
+                nonce = None
+                self.misses += 1
+            self.low_water = len(self.nonces) if self.low_water is None else min(self.low_water, len(self.nonces))
+            if len(self.nonces) <= self.refill_threshold:
+                self.condition.notify()
+        if nonce is None:
+            nonce = self._generate()
+        return nonce
+
+    def available(self):
+        with self.condition:
+            return len(self.nonces)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'refill_threshold': self.refill_threshold,
+                'available': len(self.nonces),
+                'generated': self.generated,
+                'taken': self.taken,
+                'misses': self.misses,
+                'miss_rate': self.misses / self.taken if self.taken else 0.0,
+                'low_water': self.low_water,
+            }
+
+    # Returns a fresh (k, r, k^-1 mod n) triple with r = R.x mod n for R = kG
+    def _generate(self):
+        while True:
+            k = secrets.randbelow(order - 1) + 1
+            if self.constant_time:
+                R = constant_time_base_mul(self.representation, k)
+            else:
+                R = base_mul(self.representation, k)
+            r = int(R.x.value % order)
+            # A nonce giving r = 0 cannot sign anything
+            if r == 0:
+                continue
+            with self.condition:
+                self.generated += 1
+            return (k, r, int((Fn.one / Fn(k)).value))
+
+    # Waits until the pool drops to the refill threshold, then fills it back up to its full size
+    def _refill(self):
+        while True:
+            with self.condition:
+                while not self.closed and len(self.nonces) > self.refill_threshold:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                missing = self.size - len(self.nonces)
+            for _ in range(missing):
+                nonce = self._generate()
+                with self.condition:
+                    if self.closed:
+                        return
+                    self.nonces.append(nonce)
+                    if len(self.nonces) >= self.size:
+                        break
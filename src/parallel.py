@@ -0,0 +1,119 @@
+# Parallel ECDSA over Baby Jubjub using a pool of worker processes
+# Pure Python big integer arithmetic holds the GIL, so threads cannot speed it up and processes are used instead.
+# Work crosses the process boundary as tuples of integers, and results are returned in input order.
+from concurrent.futures import ProcessPoolExecutor
+from algebra import integer_types
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, sign, verify
+import fixed_base
+
+_representations = {
+    'SWPoint': SWPoint,
+    'MontPoint': MontPoint,
+    'TwEdPoint': TwEdPoint,
+}
+
+# Representation used by the current worker process, set by _init_worker
+_worker_representation = None
+
+# Runs once in every worker process, building its base point table before any work arrives
+def _init_worker(representation_name, window):
+    global _worker_representation
+    _worker_representation = _representations[representation_name]
+    if window is not None:
+        fixed_base.set_window(window)
+    fixed_base.base_mul(_worker_representation, 1)
+
+# Checks the inputs of a verification before it is sent to a worker, so that bad input fails in the caller
+def _check_verify_input(representation, digest, pubKey, r, s):
+    assert(isinstance(pubKey, representation))
+    for name, value in [('Digest', digest), ('r', r), ('s', s)]:
+        if not isinstance(value, integer_types):
+            raise TypeError(f"{name} must be an integer.")
+    if digest < 0:
+        raise ValueError("Digest cannot be negative.")
+
+# Verifies every (digest, pubKey x, pubKey y, r, s) item on its own, returning (True, result) or (False, exception)
+# for each, so that an error in one item never affects the others
+def _verify_items(representation, items):
+    outcomes = []
+    for digest, x, y, r, s in items:
+        try:
+            outcomes.append((True, verify(representation, digest, representation(x, y), r, s)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+# Wire format: (digest, pubKey x, pubKey y, r, s), returning an outcome per item as in _verify_items
+def _verify_chunk(chunk):
+    return _verify_items(_worker_representation, chunk)
+
+# Wire format: (digest, privKey, k), returning (r, s)
+def _sign_chunk(chunk):
+    return [sign(_worker_representation, digest, privKey, k) for digest, privKey, k in chunk]
+
+# Wire format: seed, returning (privKey, pubKey x, pubKey y)
+def _keygen_chunk(chunk):
+    results = []
+    for seed in chunk:
+        priv, pub = keygen(_worker_representation, seed)
+        results.append((priv, pub.x.value, pub.y.value))
+    return results
+
+class _ParallelEngine:
+    def __init__(self, representation, max_workers=None, chunksize=64, window=None):
+        assert(representation in [SWPoint, MontPoint, TwEdPoint])
+        if chunksize < 1:
+            raise ValueError("Chunk size must be positive.")
+        self.representation = representation
+        self.chunksize = chunksize
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(representation.__name__, window),
+        )
+
+    # Splits the work into chunks so that each round trip to a worker carries many items
+    def _map(self, f, items):
+        chunks = [items[i:i + self.chunksize] for i in range(0, len(items), self.chunksize)]
+        results = []
+        for chunk_results in self.executor.map(f, chunks):
+            results += chunk_results
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ParallelVerifier(_ParallelEngine):
+    # Verifies (digest, pubKey, r, s) items, returning one boolean per item
+    # An error in verifying an item is raised once every item has been verified, or with return_exceptions=True
+    # it is returned in place of that item's result
+    def verify_many(self, items, return_exceptions=False):
+        wire = []
+        for digest, pubKey, r, s in items:
+            _check_verify_input(self.representation, digest, pubKey, r, s)
+            wire.append((digest, pubKey.x.value, pubKey.y.value, r, s))
+        results = []
+        for ok, value in self._map(_verify_chunk, wire):
+            if not ok and not return_exceptions:
+                raise value
+            results.append(value)
+        return results
+
+class ParallelSigner(_ParallelEngine):
+    # Signs (digest, privKey, random_k) items, returning one (r, s) signature per item
+    def sign_many(self, items):
+        return self._map(_sign_chunk, [tuple(item) for item in items])
+
+    # Generates a key pair for every seed, returning (privKey, pubKey) pairs
+    def keygen_many(self, seeds):
+        representation = self.representation
+        Fr = representation.Fr
+        # The public keys were computed by curve operations in the workers, so they are not validated again
+        return [(priv, representation.from_affine(Fr(x), Fr(y))) for priv, x, y in self._map(_keygen_chunk, list(seeds))]
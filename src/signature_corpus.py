@@ -0,0 +1,71 @@
+# Streaming binary format for corpora of Baby Jubjub ECDSA signatures
+# A corpus is an 8-byte magic followed by fixed-width records. Every record is seven 32-byte big-endian fields:
+# seed, digest, representation tag, pubKey x, pubKey y, r, s
+# Records are read lazily from a memory map, so a corpus of any size is processed in constant memory
+import json
+import mmap
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+
+MAGIC = b'BJJSIG01'
+FIELD_SIZE = 32
+NUM_FIELDS = 7
+RECORD_SIZE = FIELD_SIZE * NUM_FIELDS
+
+_tags = {SWPoint: 0, MontPoint: 1, TwEdPoint: 2}
+_representations = {tag: representation for representation, tag in _tags.items()}
+
+def encode_record(seed, digest, representation, pubKeyX, pubKeyY, r, s):
+    if representation not in _tags:
+        raise ValueError("Unknown representation.")
+    fields = [seed, digest, _tags[representation], pubKeyX, pubKeyY, r, s]
+    for value in fields:
+        if value < 0 or value.bit_length() > FIELD_SIZE * 8:
+            raise ValueError("Record fields must be non-negative and fit in 32 bytes.")
+    return b''.join([value.to_bytes(FIELD_SIZE, 'big') for value in fields])
+
+# Returns (seed, digest, representation, pubKeyX, pubKeyY, r, s)
+def decode_record(data):
+    if len(data) != RECORD_SIZE:
+        raise ValueError(f"Record must be {RECORD_SIZE} bytes.")
+    fields = [int.from_bytes(data[i:i + FIELD_SIZE], 'big') for i in range(0, RECORD_SIZE, FIELD_SIZE)]
+    if fields[2] not in _representations:
+        raise ValueError("Unknown representation tag.")
+    fields[2] = _representations[fields[2]]
+    return tuple(fields)
+
+# Writes records of (seed, digest, representation, pubKeyX, pubKeyY, r, s) from any iterable, returning the count
+def write_corpus(path, records):
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        for record in records:
+            f.write(encode_record(*record))
+            count += 1
+    return count
+
+# Lazily yields the records of a corpus as (seed, digest, representation, pubKeyX, pubKeyY, r, s)
+def read_corpus(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a signature corpus.")
+        size = f.seek(0, 2)
+        if (size - len(MAGIC)) % RECORD_SIZE != 0:
+            raise ValueError("Corpus is truncated.")
+        if size == len(MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(len(MAGIC), size, RECORD_SIZE):
+                yield decode_record(mapped[offset:offset + RECORD_SIZE])
+
+# Converts the JSON layout of signatures.json, where each entry is
+# [seed, digest, representation name, privKey, pubKeyX, pubKeyY, r, s], to a binary corpus
+# Private keys are not carried over. The JSON file is a single array, so it is still loaded in one go
+def convert_json(json_path, corpus_path):
+    representations = {representation.__name__: representation for representation in _tags}
+    with open(json_path, 'r') as f:
+        signatures = json.load(f)
+    records = (
+        (seed, digest, representations[name], pubKeyX, pubKeyY, r, s)
+        for seed, digest, name, _, pubKeyX, pubKeyY, r, s in signatures
+    )
+    return write_corpus(corpus_path, records)
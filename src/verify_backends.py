@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+import warnings
+
+# Verifies the curve and ECDSA give the same results on every integer backend of algebra.GF
+# The base field is built when baby_jubjub is imported, so every backend is checked in a fresh interpreter
+# with BABY_JUBJUB_BACKEND set. The fallback run hides gmpy2 to check that asking for it then uses Python integers.
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        if len(sys.argv) > 2 and sys.argv[2] == '--hide-gmpy2':
+            sys.modules['gmpy2'] = None
+        print(json.dumps(run()))
+        return
+
+    print("Verifying integer backends of the Baby Jubjub field...")
+    runs = {
+        'int': ('int', []),
+        'gmpy2': ('gmpy2', []),
+        'fallback': ('gmpy2', ['--hide-gmpy2']),
+    }
+    results = {}
+    for name, (backend, flags) in runs.items():
+        env = dict(os.environ, BABY_JUBJUB_BACKEND=backend)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run'] + flags,
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results[name] = json.loads(output)
+        print(f"Run {name} used the {results[name]['backend']} backend")
+
+    assert(results['int']['backend'] == 'int')
+    assert(results['fallback']['backend'] == 'int')
+    assert(results['fallback']['warned'])
+    if results['gmpy2']['backend'] == 'gmpy2':
+        assert(not results['gmpy2']['warned'])
+    else:
+        print("gmpy2 is not installed, so the gmpy2 run also used Python integers")
+
+    for name in ['gmpy2', 'fallback']:
+        assert(results[name]['values'] == results['int']['values'])
+        print(f"Run {name} matches Python integers")
+
+    print("Integer backends verified!")
+
+# Computes a range of values with the backend selected by BABY_JUBJUB_BACKEND, as plain integers
+def run():
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        from algebra import GF
+        from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+    from baby_jubjub_ecdsa import (
+        keygen, sign, sign_recoverable, verify, verify_with_advice, recover_public_key, verify_batch,
+    )
+    import constant_time
+
+    Fr = BabyJubjubPoint.Fr
+    values = {}
+    a = Fr(1234567890123456789)
+    b = Fr(9876543210987654321)
+    values['field'] = [
+        int((a * b).value),
+        int((a / b).value),
+        int((a * a).sqrt().value),
+        int(Fr(5).is_square()),
+        [int(inv.value) for inv in Fr.batch_inverse([a, Fr.zero, b])],
+        int((GF(101)(7) / GF(101)(3)).value),
+    ]
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        result = []
+        priv, pub = keygen(representation, 4321)
+        result.append([priv, int(pub.x.value), int(pub.y.value)])
+        for digest, k in [(1000, 10000), (2000, 20000)]:
+            r, s = sign(representation, digest, priv, k)
+            _, _, v = sign_recoverable(representation, digest, priv, k)
+            assert(verify(representation, digest, pub, r, s))
+            assert(not verify(representation, digest + 1, pub, r, s))
+            R = representation.base().scalar_mul(k)
+            assert(verify_with_advice(representation, digest, pub, r, s, R))
+            assert(verify_batch(representation, [(digest, pub, r, s, R), (digest + 1, pub, r, s, R)]) == [1])
+            assert(recover_public_key(representation, digest, r, s, v) == [pub])
+            assert(pub in recover_public_key(representation, digest, r, s))
+            result.append([r, s, v])
+        pt = constant_time.base_mul(representation, 123456789)
+        result.append([int(pt.x.value), int(pt.y.value)])
+        if representation != MontPoint:
+            result.append(pub.compress().hex())
+            assert(representation.decompress(pub.compress()) == pub)
+        values[representation.__name__] = result
+
+    return {
+        'backend': Fr.backend.name,
+        'warned': any('gmpy2' in str(warning.message) for warning in caught),
+        'values': values,
+    }
+
+if __name__ == '__main__':
+    main()
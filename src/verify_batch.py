@@ -0,0 +1,79 @@
+import time
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, sign, verify_with_advice, verify_batch, cofactor
+from fixed_base import base_mul, prepare
+
+# The cofactored equation verify_batch checks for every signature: 8(sR - mG - rQa) is the identity
+def verify_cofactored(representation, digest, pubKey, r, s, R):
+    pubKey = prepare(pubKey).point
+    return (R.scalar_mul(s) + -pubKey.scalar_mul(r) + -base_mul(representation, digest)).scalar_mul(cofactor).is_infinity()
+
+# Verifies batch verification agrees with the cofactored equation on every signature, so that a small order component
+# of R or a public key can neither vanish from the randomly weighted batch equation nor hide an invalid signature,
+# and that batching a set of valid signatures is faster than verifying them one at a time
+def main():
+    print("Verifying batch verification of ECDSA over Baby Jubjub...")
+    runs = 5
+    timed = 64
+    # (0, -1) has order 2 in Twisted Edwards form, it is (0, 0) in Montgomery form
+    torsion_twed = TwEdPoint(0, TwEdPoint.p - 1)
+    torsion = {
+        TwEdPoint: torsion_twed,
+        MontPoint: torsion_twed.to_montgomery(),
+        SWPoint: torsion_twed.to_montgomery().to_short_weierstrass(),
+    }
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        print(f"Verifying {representation.__name__}")
+        T = torsion[representation]
+        assert(not T.is_in_prime_subgroup())
+        priv, pub = keygen(representation, 4321)
+        assert(pub.is_in_prime_subgroup())
+
+        items = []
+        for digest, k in [(1000, 10000), (2000, 20001), (3000, 30002), (4000, 40003)]:
+            r, s = sign(representation, digest, priv, k)
+            R = representation.base().scalar_mul(k)
+            items += [
+                (digest, pub, r, s, R),
+                (digest, prepare(pub), r, s, R),
+                (digest, pub, r, s, R + T),
+                (digest, pub + T, r, s, R),
+                (digest, prepare(pub + T), r, s, R + T),
+                (digest + 1, pub, r, s, R),
+                (digest + 1, pub, r, s, R + T),
+                (digest + 1, prepare(pub + T), r, s, R),
+            ]
+
+        # Small order components are cleared by the cofactor, but cannot make an invalid signature pass
+        expected = [i for i, item in enumerate(items) if not verify_cofactored(representation, *item)]
+        assert(expected == [i for i in range(len(items)) if i % 8 >= 5])
+        for i, item in enumerate(items):
+            if i % 8 < 2 or i % 8 == 5:
+                assert(verify_with_advice(representation, *item) == (i not in expected))
+
+        # The batch must reject exactly the signatures that fail the cofactored equation, on every run
+        for _ in range(runs):
+            assert(verify_batch(representation, items) == expected)
+        valid = [item for i, item in enumerate(items) if i not in expected]
+        assert(verify_batch(representation, valid) == [])
+        for i, item in enumerate(items):
+            assert(verify_batch(representation, [item]) == ([0] if i in expected else []))
+
+        valid = []
+        for i in range(timed):
+            r, s = sign(representation, 5000 + i, priv, 50000 + 7 * i)
+            valid.append((5000 + i, pub, r, s, representation.base().scalar_mul(50000 + 7 * i)))
+        start = time.perf_counter()
+        assert(verify_batch(representation, valid) == [])
+        batch_time = time.perf_counter() - start
+        start = time.perf_counter()
+        assert(all(verify_with_advice(representation, *item) for item in valid))
+        single_time = time.perf_counter() - start
+        print(f"{timed} signatures: batch {batch_time:.3f}s, one at a time {single_time:.3f}s")
+        assert(batch_time < single_time)
+
+    print("Batch verification verified!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import random
+from baby_jubjub import BabyJubjubPoint, SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, sign, sign_recoverable
+import constant_time
+import fixed_base
+
+# Verifies the constant time scalar multiplication gives the same results as the variable time methods,
+# for scalars whose recoding is a special case and for points with a small order component
+def main():
+    print("Verifying constant time scalar multiplication over Baby Jubjub...")
+    rng = random.Random(1234)
+    n = BabyJubjubPoint.prime_subgroup_order
+    order = BabyJubjubPoint.order
+    scalars = [0, 1, 2, 3, 4, 15, 16, 17, n - 2, n - 1, n, n + 1, 2 * n]
+    scalars += [rng.randrange(n) | 1 for _ in range(5)] + [rng.randrange(n) & ~1 for _ in range(5)]
+
+    # A point of order 8, and the order-2 point (0, -1) of Twisted Edwards form
+    torsion8 = TwEdPoint.generator().scalar_mul(n)
+    assert(not torsion8.is_infinity() and torsion8.scalar_mul(4) != TwEdPoint.infinity())
+    torsion2 = TwEdPoint(0, TwEdPoint.p - 1)
+    base = TwEdPoint.base().scalar_mul(rng.randrange(1, n))
+    twed = [TwEdPoint.base(), TwEdPoint.generator(), torsion2, torsion8, base + torsion2, base + torsion8]
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        print(f"Verifying {representation.__name__}")
+        for scalar in scalars:
+            assert(constant_time.base_mul(representation, scalar) == fixed_base.base_mul(representation, scalar))
+
+        if representation == TwEdPoint:
+            points = twed
+        elif representation == MontPoint:
+            points = [pt.to_montgomery() for pt in twed]
+        else:
+            points = [pt.to_montgomery().to_short_weierstrass() for pt in twed]
+        for pt in points:
+            for scalar in scalars + [order - 1, order - 2]:
+                expected = pt.scalar_mul(scalar)
+                assert(constant_time.scalar_mul(pt, scalar) == expected)
+            for window in [1, 2, 3, 5]:
+                table = constant_time.ConstantTimeTable(pt, window)
+                for scalar in [0, 1, 2, n - 1, order - 1]:
+                    assert(table.scalar_mul(scalar) == pt.scalar_mul(scalar))
+
+        for seed in [1, 2, n - 1, rng.randrange(1, n)]:
+            priv, pub = keygen(representation, seed)
+            assert(keygen(representation, seed, constant_time=True) == (priv, pub))
+            for digest, k in [(0, 1), (1000, 2), (2000, n - 1), (rng.randrange(n), rng.randrange(1, n))]:
+                assert(sign(representation, digest, priv, k, constant_time=True) == sign(representation, digest, priv, k))
+                assert(sign_recoverable(representation, digest, priv, k, constant_time=True) == sign_recoverable(representation, digest, priv, k))
+
+    print("Constant time scalar multiplication verified!")
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,26 @@
 from baby_jubjub_ecdsa import keygen, sign, verify, recover_public_key, verify_with_advice
 from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from signature_corpus import read_corpus
+from conversions import convert, cache_stats
 import json
+import sys
+
+# Yields (seed, digest, representation, pubKeyX, pubKeyY, r, s)
+# Binary corpora are streamed in constant memory, JSON files have to be loaded whole
+def load_signatures(path):
+    if not path.endswith('.json'):
+        yield from read_corpus(path)
+        return
+
+    representationMap = {
+        'SWPoint': SWPoint,
+        'MontPoint': MontPoint,
+        'TwEdPoint': TwEdPoint
+    }
+    with open(path, 'r') as f:
+        signatures = json.load(f)
+    for seed, digest, representationName, privKey, pubKeyX, pubKeyY, r, s in signatures:
+        yield seed, digest, representationMap[representationName], pubKeyX, pubKeyY, r, s
 
 def main():
     print("Verifying ECDSA over Baby Jubjub...")
@@ -20,17 +40,9 @@ def main():
     # with open('signatures.json', 'w') as f:
     #     json.dump(signatures, f)
 
-    with open('signatures.json', 'r') as f:
-        signatures = json.load(f)
-
-    for sig in signatures:
-        seed, digest, representationName, privKey, pubKeyX, pubKeyY, r, s = sig
-        representationMap = {
-            'SWPoint': SWPoint,
-            'MontPoint': MontPoint,
-            'TwEdPoint': TwEdPoint
-        }
-        representation = representationMap[representationName]
+    # Either signatures.json or a binary corpus written by signature_corpus can be verified
+    path = sys.argv[1] if len(sys.argv) > 1 else 'signatures.json'
+    for seed, digest, representation, pubKeyX, pubKeyY, r, s in load_signatures(path):
         pubKey = representation(pubKeyX, pubKeyY)
         print(f"Verifying {representation.__name__} with seed {seed} and digest {digest}")
         if representation.__name__ == 'SWPoint':
@@ -38,8 +50,8 @@ def main():
 
             verifiedMont = False
             verifiedTwEd = False
-            pubKeyMont = pubKey.to_montgomery()
-            pubKeyTwEd = pubKeyMont.to_twisted_edwards()
+            pubKeyMont = convert(pubKey, MontPoint)
+            pubKeyTwEd = convert(pubKey, TwEdPoint)
             Rs = representation.recover_from_x(r)
             for R in Rs:
                 RMont = R.to_montgomery()
@@ -56,8 +68,8 @@ def main():
 
             verifiedSW = False
             verifiedTwEd = False
-            pubKeySW = pubKey.to_short_weierstrass()
-            pubKeyTwEd = pubKey.to_twisted_edwards()
+            pubKeySW = convert(pubKey, SWPoint)
+            pubKeyTwEd = convert(pubKey, TwEdPoint)
             Rs = representation.recover_from_x(r)
             for R in Rs:
                 RSW = R.to_short_weierstrass()
@@ -74,8 +86,8 @@ def main():
             
             verifiedSW = False
             verifiedMont = False
-            pubKeyMont = pubKey.to_montgomery()
-            pubKeySW = pubKeyMont.to_short_weierstrass()
+            pubKeyMont = convert(pubKey, MontPoint)
+            pubKeySW = convert(pubKey, SWPoint)
             Rs = representation.recover_from_x(r)
             for R in Rs:
                 RMont = R.to_montgomery()
@@ -91,6 +103,7 @@ def main():
         # assert(pubKey in recover_public_key(representation, digest, r, s))
         print(f"Verified {representation.__name__} with seed {seed} and digest {digest}\n")
 
+    print("Public key conversion cache: ", cache_stats())
     print("ECDSA over Baby Jubjub verified!")
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import random
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from field_vector import FieldVector, PointVector
+
+# Verifies vectorized field and point arithmetic gives the same results as FElt and the point classes
+def main():
+    print("Verifying vectorized arithmetic over the Baby Jubjub field...")
+    rng = random.Random(1234)
+    Fr = TwEdPoint.Fr
+    p = TwEdPoint.p
+
+    # Edge values first, including the largest element and values next to the limb boundaries
+    values = [0, 1, 2, p - 1, p - 2, (1 << 28) - 1, 1 << 28, (1 << 252) + 1] + [rng.randrange(p) for _ in range(40)]
+    others = [rng.randrange(p) for _ in range(len(values) - 8)] + [0, 1, p - 1, 0, p - 1, 1, 2, p - 1]
+    a = [Fr(value) for value in values]
+    b = [Fr(value) for value in others]
+    va = FieldVector.from_elements(a)
+    vb = FieldVector.from_elements(b)
+
+    print("Verifying field operations")
+    assert(va.to_ints() == values)
+    assert(va.to_elements() == a)
+    assert((va + vb).to_elements() == [x + y for x, y in zip(a, b)])
+    assert((va - vb).to_elements() == [x - y for x, y in zip(a, b)])
+    assert((vb - va).to_elements() == [y - x for x, y in zip(a, b)])
+    assert((va * vb).to_elements() == [x * y for x, y in zip(a, b)])
+    assert((-va).to_elements() == [-x for x in a])
+    assert(list(va.is_zero()) == [x == Fr.zero for x in a])
+    assert(list(va.equals(vb)) == [x == y for x, y in zip(a, b)])
+
+    # Zero maps to zero in batch inversion, and dividing by zero gives zero
+    assert(va.batch_inverse().to_elements() == Fr.batch_inverse(a))
+    assert((va / vb).to_elements() == [x * y for x, y in zip(a, Fr.batch_inverse(b))])
+    for x in a:
+        if x != Fr.zero:
+            assert(FieldVector.from_elements([x]).batch_inverse().to_elements() == [Fr.one / x])
+
+    # A vector of length 1 broadcasts against a longer one
+    for constant in [0, 1, p - 1, rng.randrange(p)]:
+        c = Fr(constant)
+        vc = FieldVector.constant(Fr, constant)
+        assert((va + vc).to_elements() == [x + c for x in a])
+        assert((va - vc).to_elements() == [x - c for x in a])
+        assert((vc - va).to_elements() == [c - x for x in a])
+        assert((va * vc).to_elements() == [x * c for x in a])
+
+    print("Verifying point conversions")
+    generator = TwEdPoint.generator()
+    twed = [generator.scalar_mul(rng.randrange(1, TwEdPoint.order)) for _ in range(20)]
+    # (0, -1) has order 2 and is (0, 0) in Montgomery form
+    torsion = TwEdPoint(0, p - 1)
+    twed += [torsion, twed[0] + torsion]
+    assert(torsion.to_montgomery() == MontPoint(0, 0))
+
+    points = {
+        TwEdPoint: twed,
+        MontPoint: [pt.to_montgomery() for pt in twed],
+        SWPoint: [pt.to_montgomery().to_short_weierstrass() for pt in twed],
+    }
+    for representation, pts in points.items():
+        vector = PointVector.from_points(pts)
+        assert(vector.to_points() == pts)
+        assert(all(vector.is_on_curve()))
+        assert(vector.to_twisted_edwards().to_points() == points[TwEdPoint])
+        assert(vector.to_montgomery().to_points() == points[MontPoint])
+        assert(vector.to_short_weierstrass().to_points() == points[SWPoint])
+
+    # Points off the curve are reported one by one
+    off_curve = PointVector(TwEdPoint, FieldVector.from_ints(Fr, [1, 0]), FieldVector.from_ints(Fr, [1, 1]))
+    assert(list(off_curve.is_on_curve()) == [False, True])
+
+    # The identity has no affine Montgomery coordinates
+    identity = PointVector.from_points([twed[0], TwEdPoint(0, 1)])
+    try:
+        identity.to_montgomery()
+        assert(False)
+    except ValueError:
+        pass
+
+    print("Vectorized arithmetic verified!")
+
+if __name__ == '__main__':
+    main()
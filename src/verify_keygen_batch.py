@@ -0,0 +1,43 @@
+import random
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, keygen_batch, order
+
+# Verifies batch key generation gives the same key pairs as generating each key on its own
+# Covers the walk along seeds in arithmetic progression, the fixed-base table for any other seeds, and the
+# conversion of Montgomery keys from Twisted Edwards form
+def main():
+    print("Verifying batch key generation over Baby Jubjub...")
+    rng = random.Random(4321)
+    start = rng.randrange(1, order // 2)
+    seeds = {
+        'strided': [start + 3 * i for i in range(20)],
+        'consecutive': list(range(1, 21)),
+        'descending': [start - 5 * i for i in range(20)],
+        'near the order': [order - 1 - 2 * i for i in range(10)],
+        'single seed': [start],
+        'two seeds': [order - 1, 1],
+        'repeated': [start] * 5,
+        'arbitrary': [rng.randrange(1, order) for _ in range(20)],
+        'nearly strided': [start + 3 * i for i in range(10)] + [start + 31],
+        'empty': [],
+    }
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        print(f"Verifying {representation.__name__}")
+        for name, batch in seeds.items():
+            expected = [keygen(representation, seed) for seed in batch]
+            assert(keygen_batch(representation, batch) == expected), name
+            for _, pub in keygen_batch(representation, iter(batch)):
+                assert(pub.is_on_curve())
+
+        for bad in [[0], [1, order], [5, -1]]:
+            try:
+                keygen_batch(representation, bad)
+                assert(False)
+            except ValueError:
+                pass
+
+    print("Batch key generation verified!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import threading
+import time
+from baby_jubjub import SWPoint, MontPoint, TwEdPoint
+from baby_jubjub_ecdsa import keygen, sign_with_pool, verify, Fn, order
+from fixed_base import base_mul
+from nonce_pool import NoncePool
+
+# Polls until condition holds, as the refill thread works asynchronously
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert(time.monotonic() < deadline)
+        time.sleep(0.001)
+
+def check_nonce(representation, nonce):
+    k, r, k_inv = nonce
+    assert(0 < k < order)
+    assert(r == base_mul(representation, k).x.value % order)
+    assert(Fn(k) * Fn(k_inv) == Fn.one)
+
+# Verifies the nonce pool hands out every nonce at most once, refills at its threshold, counts misses and stops
+# its refill thread when closed, and that signatures made with it verify
+def main():
+    print("Verifying the nonce pool for ECDSA over Baby Jubjub...")
+
+    for representation in [SWPoint, MontPoint, TwEdPoint]:
+        print(f"Verifying {representation.__name__}")
+
+        # A pool that was never started computes every nonce inline
+        pool = NoncePool(representation, size=4)
+        for _ in range(3):
+            check_nonce(representation, pool.take())
+        stats = pool.stats()
+        assert(stats['taken'] == 3 and stats['misses'] == 3 and stats['miss_rate'] == 1.0)
+        assert(stats['available'] == 0 and pool.thread is None)
+        pool.close()
+
+        # Refilling starts once the pool is down to its threshold, and fills it back up to its size
+        pool = NoncePool(representation, size=8, refill_threshold=2)
+        pool.start()
+        wait_until(lambda: pool.available() == 8)
+        taken = [pool.take() for _ in range(5)]
+        time.sleep(0.05)
+        assert(pool.available() == 3 and pool.stats()['generated'] == 8)
+        taken.append(pool.take())
+        wait_until(lambda: pool.available() == 8)
+        stats = pool.stats()
+        assert(stats['misses'] == 0 and stats['low_water'] == 2)
+        assert(stats['generated'] == stats['taken'] + stats['available'])
+
+        # No nonce is handed out twice, with several threads taking while the refill thread runs
+        def take_many():
+            for _ in range(25):
+                nonce = pool.take()
+                with lock:
+                    taken.append(nonce)
+        lock = threading.Lock()
+        threads = [threading.Thread(target=take_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert(len(taken) == 106 and pool.stats()['taken'] == 106)
+        assert(len(set(nonce[0] for nonce in taken)) == len(taken))
+        for nonce in taken:
+            check_nonce(representation, nonce)
+
+        # Closing stops the refill thread and discards the nonces left
+        thread = pool.thread
+        available = pool.available()
+        pool.close()
+        assert(not thread.is_alive() and pool.thread is None)
+        assert(pool.available() == 0)
+        # At most the nonce the refill thread was computing when closed is neither taken nor left in the pool
+        generated = pool.stats()['generated']
+        assert(106 + available <= generated <= 106 + 8 + 1)
+        try:
+            pool.take()
+            assert(False)
+        except ValueError:
+            pass
+
+        priv, pub = keygen(representation, 4321)
+        with NoncePool(representation, size=4) as pool:
+            for digest in range(1000, 1010):
+                r, s = sign_with_pool(representation, digest, priv, pool)
+                assert(verify(representation, digest, pub, r, s))
+        assert(not pool.thread)
+
+    print("Nonce pool verified!")
+
+if __name__ == '__main__':
+    main()